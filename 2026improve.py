@@ -3,9 +3,28 @@ import pandas as pd
 import gspread
 from oauth2client.service_account import ServiceAccountCredentials
 from datetime import datetime, timedelta
-import requests
-import random
-import time
+import os
+from requests.adapters import HTTPAdapter
+import threading
+from storage import SheetsStorage, SQLiteStorage, DEFAULT_TRAINER, open_sheets
+from snapshot import Snapshot, Loader, SNAPSHOT_PATH
+from pokedex import load_catalog, get_poke_info
+from game_state import GameState
+from gacha import PULL_COST, PAYBACK, COLLECTION_SETS, draw, pull_rows
+from sprites import SpriteStore
+from compaction import is_meta
+from views import dex_cells, set_card
+from rollups import PERIOD_LABELS, growth_frames
+import heapq
+import uuid
+import profiling
+from profiling import span, TracedProxy
+from sheets_client import Quota, QuotaClient
+
+# [타이밍] rerun 마다 Trace 하나. st.rerun() 으로 중간에 끊긴 이전 Trace 는 여기서 마저 기록한다
+if "_sid" not in st.session_state: st.session_state["_sid"] = uuid.uuid4().hex[:12]
+if st.session_state.get("_trace") is not None: profiling.end(st.session_state["_trace"], interrupted=True)
+st.session_state["_trace"] = profiling.begin(st.session_state["_sid"])
 
 # ==========================================
 # 1. 구글 시트 연동
@@ -13,117 +32,160 @@ import time
 SCOPE = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
 SHEET_NAME = "Gwanhee_Data" 
 
+HTTP_POOL_SIZE = 32     # 트레이너 수십 명이 한 클라이언트를 같이 쓴다
+QUOTA_PER_MIN = 55      # Sheets API 기본 한도 (서비스 계정당 분당 읽기/쓰기 60) 보다 조금 아래
+SYNC_MAX_AGE = 2.0      # 같은 트레이너의 여러 세션이 이 간격 안에서는 시트를 다시 읽지 않는다
+
+# [트레이너 목록]
+# secrets.toml 의 trainers = ["관희", "민수"] 또는 GWANHEE_TRAINERS="관희,민수"
+def load_trainers():
+    try: names = list(st.secrets.get("trainers", []))
+    except FileNotFoundError: names = []
+    names = names or [n.strip() for n in os.environ.get("GWANHEE_TRAINERS", "").split(",") if n.strip()]
+    return names or [DEFAULT_TRAINER]
+
+TRAINERS = load_trainers()
+trainer = st.session_state.get("trainer") or st.query_params.get("trainer") or TRAINERS[0]
+if trainer not in TRAINERS: trainer = TRAINERS[0]
+
+# 할당량은 프로세스 전체에서 하나 (모든 트레이너/세션이 같은 서비스 계정을 쓴다)
 @st.cache_resource
-def connect_db_v40(): # 버전 변경 (캐시 초기화)
+def get_quota():
+    return Quota(reads_per_min=QUOTA_PER_MIN, writes_per_min=QUOTA_PER_MIN)
+
+# 모든 트레이너가 공유하는 인증 클라이언트 하나 (HTTP 커넥션 풀 포함)
+@st.cache_resource
+def get_client():
     if "gcp_service_account" in st.secrets:
         creds_dict = st.secrets["gcp_service_account"]
         creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, SCOPE)
     else:
         try: creds = ServiceAccountCredentials.from_json_keyfile_name("service_account.json", SCOPE)
-        except: st.error("인증 파일 오류"); st.stop()
-            
-    client = gspread.authorize(creds)
-    sh = client.open(SHEET_NAME)
+        except (OSError, ValueError, KeyError) as e: st.error(f"인증 파일 오류: {e}"); st.stop()
     
-    try: ws_status = sh.worksheet("Status")
-    except: ws_status = sh.add_worksheet("Status", 10, 5)
-    try: ws_logs = sh.worksheet("Logs")
-    except: ws_logs = sh.add_worksheet("Logs", 1000, 5); ws_logs.append_row(["Time", "Action", "XP", "Value"])
-    try: ws_col = sh.worksheet("Collection")
-    except: ws_col = sh.add_worksheet("Collection", 1000, 6); ws_col.append_row(["ID", "Name", "Date", "Rarity", "Cost", "Type"])
+    client = gspread.authorize(creds)
+    # gspread 5 는 client.session, 6 은 client.http_client.session
+    session = getattr(getattr(client, "http_client", client), "session", None)
+    if session is not None:
+        session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=HTTP_POOL_SIZE))
+    # 이후 모든 gspread 호출이 할당량 (토큰 버킷/읽기 합치기/재시도) 을 거치고 sheets.* span 으로 남는다
+    return TracedProxy(QuotaClient(client, get_quota()))
+
+# secrets 의 sheet_key 가 있으면 이름 검색 (Drive API) 없이 바로 연다
+@st.cache_resource
+def get_spreadsheet():
+    try: key = st.secrets.get("sheet_key")
+    except FileNotFoundError: key = None
+    return get_client().open_by_key(key) if key else get_client().open(SHEET_NAME)
+
+# 기본 트레이너는 예전 이름 그대로 (Status/Logs/Collection), 나머지는 Logs_민수 처럼 나눈다
+def partition(base, name):
+    return base if name == DEFAULT_TRAINER else f"{base}_{name}"
+
+# 워크시트 목록 + 첫 읽기를 API 두 번에 (없는 시트는 그때 만든다, storage.open_sheets 참고)
+def connect_db(name=DEFAULT_TRAINER):
+    titles = {base: partition(base, name) for base in ("Status", "Logs", "Collection")}
+    return open_sheets(get_spreadsheet(), titles)
+
+# [저장소 선택]
+# secrets.toml 의 [storage] 또는 환경변수로 고른다.
+#   backend = "sheets" (기본) | "sqlite"
+#   sqlite_path = "gwanhee.db"
+#   mirror_sheets = true   -> SQLite 를 쓰면서 시트에도 복제
+JOURNAL_PATH = ".gwanhee_journal.jsonl"
+
+def load_storage_config():
+    try: cfg = dict(st.secrets.get("storage", {}))
+    except FileNotFoundError: cfg = {}
+    cfg.setdefault("backend", os.environ.get("GWANHEE_STORAGE", "sheets"))
+    cfg.setdefault("sqlite_path", os.environ.get("GWANHEE_SQLITE_PATH", "gwanhee.db"))
+    return cfg
+
+def journal_path(name):
+    return JOURNAL_PATH if name == DEFAULT_TRAINER else JOURNAL_PATH.replace(".jsonl", f"_{name}.jsonl")
+
+def build_storage(name):
+    cfg = load_storage_config()
+    def sheets():
+        ws, values = connect_db(name)
+        return SheetsStorage(ws["Status"], ws["Logs"], ws["Collection"], journal_path(name), max_age=SYNC_MAX_AGE, initial=values)
+    if cfg["backend"] == "sqlite":
+        return SQLiteStorage(cfg["sqlite_path"], trainer=name, mirror=sheets() if cfg.get("mirror_sheets") else None)
+    return sheets()
+
+# 트레이너마다 하나 (같은 트레이너의 세션들은 스냅샷/저널을 공유).
+# 연결은 백그라운드에서 하고, 끝나기 전에는 로컬 스냅샷으로 첫 화면을 그린다.
+@st.cache_resource
+def get_loaders():
+    return {}, threading.Lock()
 
-    return ws_status, ws_logs, ws_col
+def storage_loader(name):
+    loaders, lock = get_loaders()
+    with lock:
+        if name not in loaders: loaders[name] = Loader(lambda: build_storage(name))
+        return loaders[name]
 
-try: ws_status, ws_logs, ws_col = connect_db_v40()
-except Exception as e: st.error(f"연결 실패: {e}"); st.stop()
+@st.cache_resource
+def get_snapshot(name):
+    return Snapshot(SNAPSHOT_PATH if name == DEFAULT_TRAINER else SNAPSHOT_PATH.replace(".json", f"_{name}.json"))
+
+loader = storage_loader(trainer)
+first_paint = None if loader.ready() else get_snapshot(trainer).load()
+storage = None
+try:
+    with span("connect", "sheets"):
+        if first_paint is None: storage = loader.wait()
+except Exception as e:
+    get_loaders()[0].pop(trainer, None)     # 다음 rerun 에 다시 연결
+    st.error(f"연결 실패: {e}"); st.stop()
 
 # ==========================================
 # 2. 데이터 로드
 # ==========================================
-def load_data():
-    logs_data = ws_logs.get_all_records()
-    col_data = ws_col.get_all_values()
-    
-    total_xp = 0
-    claimed_sets = set() 
-
-    for log in logs_data:
-        try: 
-            xp = int(log.get("XP", 0)) if isinstance(log, dict) else int(log[2])
-            act = log.get("Action", "") if isinstance(log, dict) else log[1]
-            total_xp += xp
-            if "[업적 달성]" in act:
-                set_name = act.split("] ")[1]
-                claimed_sets.add(set_name)
-        except: continue
-            
-    used_gold = 0
-    my_pokemon_counts = {} 
-    my_shinies = set() 
-    
-    if len(col_data) > 1:
-        for row in col_data[1:]:
-            try:
-                pid = int(row[0])
-                rarity = row[3]
-                cost = int(row[4])
-                used_gold += cost
-                
-                my_pokemon_counts[pid] = my_pokemon_counts.get(pid, 0) + 1
-                if "Shiny" in rarity:
-                    my_shinies.add(pid)
-            except: continue
-            
-    current_gold = total_xp - used_gold
-    
-    level = 1
-    temp = total_xp
-    while temp >= level * 100:
-        temp -= level * 100
-        level += 1
-    current_xp = temp
-    
-    if isinstance(logs_data, list): logs_data.reverse()
-    return level, current_xp, total_xp, current_gold, logs_data, my_pokemon_counts, my_shinies, claimed_sets
-
-level, current_xp, total_xp, gold, logs, my_pokemon_counts, my_shinies, claimed_sets = load_data()
+# 집계 상태는 rerun 사이에 유지하고 새로 들어온 행만 반영한다
+@st.cache_resource
+def get_state(name):
+    return GameState()
+
+# 재시도까지 다 실패하면 (할당량/네트워크) 가진 스냅샷 + 저널로 그린다. 쓰기는 저널에 남아 있다.
+# 받아 둔 스냅샷이 없으면 (압축 직후 등) 빈 기록으로 덮지 않고 지난 집계 상태를 그대로 보여 준다.
+# -> (state, 시트와 맞춘 상태인지)
+sync_warnings, sync_errors = [], []
+
+def load_data(refresh=True):
+    state = get_state(trainer)
+    with span("storage.read_all", "storage"):
+        try: logs_data, col_rows = storage.read_all(refresh)
+        except Exception as e:
+            if not storage.loaded():
+                sync_errors.append(f"⚠️ 시트를 읽지 못해 지난 화면을 그대로 보여 줍니다. 새 기록은 저장 대기 중이에요 ({e})")
+                return state, False
+            sync_warnings.append(f"⏳ 시트 응답이 늦어 마지막으로 받은 기록으로 보여 줍니다 ({e})")
+            logs_data, col_rows = storage.read_all(refresh=False)
+    with span("state.sync", "aggregate"): return state.sync(logs_data, col_rows), True
+
+# 액션 직후 rerun 은 원격을 다시 읽지 않는다 (방금 쓴 행은 저널에서 바로 보인다).
+# 시트와의 대조는 다음 rerun 에서.
+# 저장에 실패해 버려진 쓰기는 저널에서 빠졌으므로 sync 가 알아서 되돌린다. 알리기만 한다.
+# _acted 는 어느 쪽이든 여기서 꺼낸다 (스냅샷 화면에서도 live() 가 세우므로 남겨 두면 rerun_if_acted 가 계속 돈다)
+acted = st.session_state.pop("_acted", False)
+if storage is None:
+    failures = []
+    with span("snapshot", "storage"): state = get_state(trainer).sync(*first_paint[:2])
+else:
+    failures = storage.take_failures()
+    state, synced = load_data(refresh=not acted)
+    if synced:
+        with state.lock: get_snapshot(trainer).maybe_save(state.logs, state.cols)
+level, current_xp, total_xp, gold = state.level, state.current_xp, state.total_xp, state.gold
+logs, my_pokemon_counts, my_shinies, claimed_sets = state.logs, state.pokemon_counts, state.shinies, state.claimed_sets
 next_level_xp = level * 100
 
 # ==========================================
 # 3. 로직 함수 (티어/스트릭/칭호)
 # ==========================================
-TIER_MAP = [
-    {"name": "Iron", "start": 1, "color": "#717171"},
-    {"name": "Bronze", "start": 13, "color": "#8C7853"},
-    {"name": "Silver", "start": 25, "color": "#808B96"},
-    {"name": "Gold", "start": 37, "color": "#D4AC0D"},
-    {"name": "Platinum", "start": 49, "color": "#27AE60"},
-    {"name": "Diamond", "start": 73, "color": "#2980B9"},
-    {"name": "Master", "start": 85, "color": "#8E44AD"},
-    {"name": "Challenger", "start": 109, "color": "#F1C40F"}
-]
-def get_tier(lv):
-    for i in range(len(TIER_MAP)-1, -1, -1):
-        if lv >= TIER_MAP[i]["start"]: return TIER_MAP[i]["name"], TIER_MAP[i]["color"]
-    return "Iron", "#717171"
-cur_n, cur_c = get_tier(level)
-
-def get_streak(logs_data):
-    if not logs_data: return 0
-    try: dates = sorted(list(set([log['Time'].split(' ')[0] for log in logs_data])), reverse=True)
-    except: return 0
-    if not dates: return 0
-    streak = 0
-    now_kst = datetime.now() + timedelta(hours=9)
-    today_str = now_kst.strftime("%Y-%m-%d")
-    check_date = now_kst
-    if dates[0] != today_str: check_date = now_kst - timedelta(days=1)
-    for i in range(len(dates)):
-        target = (check_date - timedelta(days=streak)).strftime("%Y-%m-%d")
-        if target in dates: streak += 1
-        else: break
-    return streak
-current_streak = get_streak(logs)
+cur_n, cur_c = state.tier
+with span("streak", "aggregate"): current_streak = state.streak((datetime.now() + timedelta(hours=9)).strftime("%Y-%m-%d"))
 
 def get_unlocked_titles(counts, shinies):
     titles = ["신참 트레이너"] 
@@ -137,126 +199,185 @@ def get_unlocked_titles(counts, shinies):
     if 133 in counts: titles.append("브이즈 마니아")
     return titles
 
-COLLECTION_SETS = [
-    {"name": "태초마을의 시작", "desc": "오박사님이 주신 선택받은 세 마리.", "ids": [1, 4, 7], "reward": 1000},
-    {"name": "상록숲의 악몽", "desc": "풀숲에 들어가면 끝도 없이 나오는 친구들.", "ids": [10, 13, 16, 19], "reward": 500},
-    {"name": "니드런 왕실", "desc": "왕과 여왕, 그리고 그들의 아이들.", "ids": [29, 32, 31, 34], "reward": 1200},
-    {"name": "이브이 4형제", "desc": "가능성은 무한대! 진화의 돌이 필요해.", "ids": [133, 134, 135, 136], "reward": 1500},
-    {"name": "곤충 채집 소년", "desc": "상록숲의 진정한 지배자들.", "ids": [12, 15, 49, 123, 127], "reward": 1000},
-    {"name": "로켓단의 음모", "desc": "이 세계의 파괴를 막기 위해!", "ids": [23, 24, 52, 109, 110], "reward": 1200},
-    {"name": "격투 도장", "desc": "노란시티 격투 도장의 챔피언들.", "ids": [57, 68, 106, 107], "reward": 1500},
-    {"name": "초능력자", "desc": "숟가락 구부리기의 달인들.", "ids": [65, 97, 122], "reward": 1500},
-    {"name": "폭포오르기", "desc": "약한 잉어킹이 흉폭한 용이 되기까지.", "ids": [129, 130], "reward": 1000},
-    {"name": "고대 화석의 비밀", "desc": "박물관에서 되살려낸 고대의 존재.", "ids": [139, 141, 142], "reward": 2000},
-    {"name": "전설의 새", "desc": "관동 지방 하늘을 지배하는 전설.", "ids": [144, 145, 146], "reward": 3000},
-    {"name": "최강의 유전자", "desc": "환상의 포켓몬과 그 복제물.", "ids": [150, 151], "reward": 5000}
-]
-
 # ==========================================
 # 4. 액션 함수
 # ==========================================
+# 버튼 on_click 콜백. 스크립트보다 먼저 돌고, 쓰기는 저널에 넣기만 한다 (시트 전송은 백그라운드).
+# 이어지는 rerun 이 새 행을 바로 반영하므로 sleep / st.rerun 이 필요 없다.
+# 알림은 set_page_config 뒤에 띄우도록 _flash 에 모아 둔다.
+def flash(kind, *args):
+    st.session_state.setdefault("_flash", []).append((kind, *args))
+    st.session_state["_acted"] = True
+
+# 스냅샷으로 그린 화면에서는 아직 쓸 곳이 없다
+def live():
+    if storage is not None: return True
+    flash("warning", "아직 최신 기록을 불러오는 중이에요. 잠시 후 다시 눌러 주세요.")
+    return False
+
 def add_xp(amt, act, val):
+    if not live(): return
     ts = (datetime.now() + timedelta(hours=9)).strftime("%Y-%m-%d %H:%M:%S")
-    ws_logs.append_row([ts, act, int(amt), val])
-    try: ws_status.update_cell(2, 1, level)
-    except: pass
-    st.toast(f"✅ 기록 완료! (+{int(amt)}G)", icon="🔥")
-    time.sleep(0.5)
-    st.rerun()
+    storage.append_log([ts, act, int(amt), val])
+    storage.set_status(state.level)
+    flash("toast", f"✅ 기록 완료! (+{int(amt)}G)", "🔥")
+
+# 입력칸 값으로 기록 (key: number_input 의 key)
+def add_xp_from(key, rate, label):
+    v = st.session_state[key]
+    if v > 0: add_xp(v * rate, label.format(v=v), v)
 
 def claim_set_reward(set_name, reward):
+    if not live(): return
     ts = (datetime.now() + timedelta(hours=9)).strftime("%Y-%m-%d %H:%M:%S")
-    ws_logs.append_row([ts, f"[업적 달성] {set_name}", reward, 0])
-    st.balloons()
-    st.success(f"🏆 업적 달성! [{set_name}] 보상 {reward}G 지급!")
-    time.sleep(2)
-    st.rerun()
+    storage.append_log([ts, f"[업적 달성] {set_name}", reward, 0])
+    flash("balloons")
+    flash("success", f"🏆 업적 달성! [{set_name}] 보상 {reward}G 지급!")
 
 def undo():
-    if logs:
-        ws_logs.delete_rows(len(ws_logs.get_all_values()))
-        st.toast("↩️ 취소됨", icon="🗑️")
-        st.rerun()
-
-def process_gacha(pid, name, rarity, cost, p_type, is_duplicate, current_count, is_shiny):
+    if not live(): return
+    # 압축 요약/체크포인트 행은 취소 대상이 아니다
+    if state.logs and is_meta(state.logs[-1].get("Action", "")):
+        flash("warning", "취소할 기록이 없습니다 (이전 기록은 압축됨)")
+    elif state.logs:
+        storage.delete_last_log()
+        flash("toast", "↩️ 취소됨", "🗑️")
+
+def process_pulls(n):
     now = (datetime.now() + timedelta(hours=9)).strftime("%Y-%m-%d")
     ts = (datetime.now() + timedelta(hours=9)).strftime("%Y-%m-%d %H:%M:%S")
     
-    final_rarity = rarity
-    if is_shiny:
-        final_rarity = "Shiny" 
-        name = f"🌟 {name}"
+    with state.lock: results = draw(state.pokemon_counts, n)
+    col_rows, log_rows = pull_rows(results, get_poke_info_fast, now, ts)
+    # 몇 번을 뽑든 저널 fsync 는 시트마다 한 번 (컬렉션 + 페이백 로그)
+    storage.append_collection(col_rows)
+    if log_rows: storage.append_logs(log_rows)
     
-    ws_col.append_row([pid, name, now, final_rarity, cost, p_type])
+    shinies = [row[1] for row, (_, _, is_shiny) in zip(col_rows, results) if is_shiny]
+    news = [row[1] for row, (_, is_dup, is_shiny) in zip(col_rows, results) if not is_dup and not is_shiny]
     
-    if is_shiny:
-        st.balloons()
-        st.success(f"✨ 대박! 이로치 {name} 등장!")
-        time.sleep(2)
-        st.rerun()
-    elif is_duplicate:
-        payback = 250
-        ws_logs.append_row([ts, f"♻️ 페이백 ({name})", payback, 0])
-        st.toast(f"😢 중복.. 250G 환급", icon="♻️")
-        time.sleep(1.5)
-        st.rerun()
-    else:
-        st.balloons()
-        st.toast(f"🎉 NEW! {name} 획득!", icon="📦")
-        time.sleep(1.5)
-        st.rerun()
-
-KOR_NAMES = {
-    1:"이상해씨", 2:"이상해풀", 3:"이상해꽃", 4:"파이리", 5:"리자드", 6:"리자몽",
-    7:"꼬부기", 8:"어니부기", 9:"거북왕", 10:"캐터피", 11:"단데기", 12:"버터플",
-    13:"뿔충이", 14:"딱충이", 15:"독침붕", 16:"구구", 17:"피죤", 18:"피죤투", 19:"꼬렛",
-    23:"아보", 24:"아보크", 25:"피카츄", 26:"라이츄", 29:"니드런♀", 31:"니드퀸", 32:"니드런♂", 34:"니드킹",
-    39:"푸린", 52:"나옹", 54:"고라파덕", 57:"성원숭", 59:"윈디", 65:"후딘", 68:"괴력몬", 74:"꼬마돌", 94:"팬텀", 95:"롱스톤",
-    97:"슬리퍼", 106:"시라소몬", 107:"홍수몬", 109:"또가스", 110:"또도가스", 122:"마임맨", 123:"스라이크", 127:"쁘사이저",
-    129:"잉어킹", 130:"갸라도스", 131:"라프라스", 133:"이브이", 134:"샤미드", 135:"쥬피썬더", 136:"부스터",
-    139:"암스타", 141:"투구푸스", 142:"프테라",
-    143:"잠만보", 144:"프리져", 145:"썬더", 146:"파이어",
-    149:"망나뇽", 150:"뮤츠", 151:"뮤"
-}
+    if n == 1:
+        name = col_rows[0][1]
+        if shinies:
+            flash("balloons")
+            flash("success", f"✨ 대박! 이로치 {name} 등장!")
+        elif log_rows:
+            flash("toast", f"😢 중복.. {PAYBACK}G 환급", "♻️")
+        else:
+            flash("balloons")
+            flash("toast", f"🎉 NEW! {name} 획득!", "📦")
+        return
+    
+    if shinies or news: flash("balloons")
+    st.session_state["pull_result"] = (f"🎁 {n}연차 결과: NEW {len(news)} · 중복 {len(log_rows)} (+{len(log_rows) * PAYBACK}G) · ✨ 이로치 {len(shinies)}",
+                                       ", ".join(row[1] for row in col_rows))
+
+def compact_logs():
+    if not live(): return
+    cutoff = ((datetime.now() + timedelta(hours=9)) - timedelta(days=st.session_state["keep_days"])).strftime("%Y-%m-%d")
+    try: moved = storage.compact_logs(cutoff)
+    except Exception as e:
+        flash("error", f"압축하다 멈췄습니다. 다시 실행하면 이어서 합니다 ({e})")
+        return
+    flash("toast", f"🧹 {moved}건 압축 완료" if moved else "압축할 기록이 없습니다", "🧹")
+    st.session_state["_acted"] = False    # 시트가 바뀌었으니 다음 rerun 은 새로 읽는다
+
+# fragment 안의 버튼으로 기록이 바뀌었으면 (헤더의 골드/레벨 등) 전체를 다시 그린다
+def rerun_if_acted():
+    if st.session_state.get("_acted"): st.rerun()
+
+def try_pulls(n):
+    if not live(): return
+    if state.gold >= n * PULL_COST: process_pulls(n)
+    else: flash("error", "골드가 부족합니다! 성장 탭에서 운동하세요!")
+
+# 입력칸 값으로 뽑기 (add_xp_from 과 같은 이유로 지금 값을 읽는다)
+def try_pulls_from(key):
+    try_pulls(st.session_state[key])
+
+# 도감 정보는 번들 카탈로그에서 (네트워크 없음, 항상 같은 희귀도)
+@st.cache_resource
+def get_catalog():
+    return load_catalog()
+
 def get_poke_info_fast(pid):
-    try:
-        url = f"https://pokeapi.co/api/v2/pokemon/{pid}"
-        res = requests.get(url, timeout=2).json()
-        p_type = res['types'][0]['type']['name']
-        k_name = KOR_NAMES.get(pid, res['name'].capitalize())
-        stats = sum([s['base_stat'] for s in res['stats']])
-        rarity = "Normal"
-        if stats >= 580: rarity = "Legend"
-        elif stats >= 500: rarity = "Rare"
-        if pid in [1,4,7,25,133,143,149,150,151]: rarity = "Special"
-        return k_name, rarity, p_type
-    except: return "Unknown", "Normal", "normal"
+    return get_poke_info(get_catalog(), pid)
+
+# 스프라이트는 로컬에 받아 두고 data-URI 로 인라인 (브라우저 외부 요청 없음)
+@st.cache_resource
+def get_sprites():
+    store = SpriteStore()
+    store.prefetch_async()
+    return store
+
+sprites = get_sprites()
 
 # ==========================================
 # 5. UI 구성
 # ==========================================
-st.set_page_config(page_title="관희의 성장 RPG", page_icon="🔥", layout="centered")
+st.set_page_config(page_title=f"{trainer}의 성장 RPG", page_icon="🔥", layout="centered")
 
 st.markdown("""
 <style>
-    .shadow-img { filter: brightness(0) opacity(0.2); width: 40px; margin-right: 5px; }
+    .shadow-img { width: 40px; margin-right: 5px; }
     .color-img { filter: brightness(1); width: 60px; }
     .poke-box { background-color: #f9f9f9; border-radius: 8px; padding: 5px; text-align: center; border: 1px solid #eee; margin-bottom: 5px; }
     .shiny-box { background-color: #FFF8E1; border: 2px solid #FFD700; border-radius: 8px; padding: 5px; text-align: center; margin-bottom: 5px; }
     .set-card { border: 1px solid #ddd; padding: 15px; border-radius: 12px; margin-bottom: 12px; background-color: #ffffff; }
+    .set-bar { background-color: #eee; border-radius: 4px; height: 8px; margin-bottom: 4px; overflow: hidden; }
+    .set-bar > div { background-color: #FF4B4B; height: 100%; }
+    .dex-grid { display: grid; grid-template-columns: repeat(3, 1fr); gap: 5px; }
 </style>
 """, unsafe_allow_html=True)
 
+# [액션 알림 / 저장 실패 되돌림]
+for kind, *args in st.session_state.pop("_flash", []):
+    getattr(st, kind)(*args[:1], **({"icon": args[1]} if len(args) > 1 else {}))
+for msg in sync_warnings: st.warning(msg)
+for msg in sync_errors: st.error(msg)
+if storage is not None:
+    n_backlog, write_error = storage.backlog()
+    if write_error is not None: st.caption(f"💾 시트 저장 대기 {n_backlog}건 · 재시도 중 ({write_error})")
+    # 저장 실패(4xx)는 탭하고 1초 넘게 지나 백그라운드에서 정해진다. 보낼 것이 다 빠질 때까지
+    # 지켜보다가 전체를 다시 그려 되돌림을 바로 보여 준다
+    if n_backlog:
+        @st.fragment(run_every=1.0)
+        def watch_backlog():
+            if storage.backlog()[0] == 0:
+                st.session_state["_acted"] = True     # 보낸 행은 이미 스냅샷에 있다. 시트는 다시 읽지 않는다
+                st.rerun()
+        watch_backlog()
+for f in failures:
+    what = f["row"][1] if f["sheet"] != "Status" and len(f["row"]) > 1 else f["sheet"]
+    st.error(f"⚠️ 저장 실패로 되돌렸습니다: {what} ({f['error']})")
+
 # [칭호 로직]
-unlocked_titles = get_unlocked_titles(my_pokemon_counts, my_shinies)
+with span("titles", "aggregate"): unlocked_titles = get_unlocked_titles(my_pokemon_counts, my_shinies)
 if 'my_title' not in st.session_state: st.session_state['my_title'] = unlocked_titles[-1]
 
 with st.sidebar:
+    if len(TRAINERS) > 1:
+        st.selectbox("👤 트레이너", TRAINERS, index=TRAINERS.index(trainer), key="trainer")
+        st.query_params["trainer"] = trainer
     st.markdown("### 🏷️ 칭호 설정")
     st.session_state['my_title'] = st.selectbox("칭호를 선택하세요", unlocked_titles, index=len(unlocked_titles)-1)
+    
+    with st.expander("🧹 로그 압축"):
+        st.caption("오래된 기록을 날짜별 요약으로 합치고 원본은 아카이브로 옮깁니다. 합계/그래프/스트릭은 그대로입니다.")
+        st.number_input("최근 며칠은 그대로 둘까요?", 7, 3650, 30, 1, key="keep_days")
+        st.button("압축 실행", key="compact", on_click=compact_logs)
+
+# [스냅샷으로 먼저 그린 경우] 연결이 끝나면 전체를 다시 그린다
+if first_paint is not None:
+    @st.fragment(run_every=0.5)
+    def wait_for_live():
+        if loader.ready(): st.rerun()
+        saved = datetime.fromtimestamp(first_paint[2]) + timedelta(hours=9)
+        st.caption(f"📦 {saved:%m/%d %H:%M} 저장본을 먼저 보여 주는 중 · 최신 기록 불러오는 중…")
+    wait_for_live()
 
 # [헤더]
-st.title(f"🔥 [{st.session_state['my_title']}] 관희")
+st.title(f"🔥 [{st.session_state['my_title']}] {trainer}")
 
 # [날짜 & D-Day 표시 (KST 적용)]
 now_kst = datetime.now() + timedelta(hours=9)
@@ -280,161 +401,151 @@ st.divider()
 
 tab1, tab2, tab3 = st.tabs(["🏠 성장", "🏥 뽑기", "🎒 도감/업적"])
 
-# 1. 성장
-with tab1:
+# 1. 성장 (fragment: 입력칸/분석 조작은 이 부분만 다시 그린다)
+@st.fragment
+def growth_section():
+    rerun_if_acted()
     st.subheader("📊 성장 그래프 (7일)")
-    if logs:
-        df = pd.DataFrame(logs)
-        df['Date'] = df['Time'].apply(lambda x: x.split(' ')[0])
-        daily_xp = df.groupby('Date')['XP'].sum().tail(7)
+    if state.daily_xp:
+        with span("daily_chart", "aggregate"):
+            days = sorted(heapq.nlargest(7, state.daily_xp))
+            daily_xp = pd.Series([state.daily_xp[d] for d in days], index=pd.Index(days, name="Date"), name="XP")
         st.bar_chart(daily_xp, color="#FF4B4B")
 
+        # 장기 분석: 미리 쌓아 둔 일/주/월 누적만 읽는다 (로그 수와 무관)
+        with st.expander("📈 장기 분석"):
+            RANGES = {"1개월": 31, "3개월": 92, "1년": 366, "3년": 1096, "전체": None}
+            a1, a2 = st.columns(2)
+            rng = a1.radio("기간", list(RANGES), index=1, horizontal=True, key="an_range")
+            period = a2.radio("단위", list(PERIOD_LABELS), index=0 if rng in ("1개월", "3개월") else 2,
+                              format_func=PERIOD_LABELS.get, horizontal=True, key="an_period")
+            since = None
+            if RANGES[rng]: since = ((datetime.now() + timedelta(hours=9)) - timedelta(days=RANGES[rng] - 1)).strftime("%Y-%m-%d")
+            with span("rollup_frames", "aggregate"), state.lock: pivot, totals = growth_frames(state.rollups, period, since)
+            if pivot.empty: st.caption("이 기간에는 기록이 없어요.")
+            else:
+                st.bar_chart(pivot)
+                st.dataframe(totals.rename(columns={"XP": "XP", "Count": "횟수", "Value": "수치", "Share": "비중(%)"}), use_container_width=True)
+
     st.subheader("📝 오늘의 기록")
     t_phy, t_brain, t_routine = st.tabs(["⚔️ 피지컬", "🧠 뇌지컬", "🛡️ 루틴"])
     
     with t_phy:
         c1, c2 = st.columns(2)
         with c1:
-            v1 = st.number_input("달리기(km)", 0.0, 42.0, 5.0, 0.1, key="run")
-            if st.button("기록 (+50G/km)", key="b1", type="primary", use_container_width=True): 
-                if v1>0: add_xp(v1*50, f"🏃 달리기 {v1}km", v1)
+            st.number_input("달리기(km)", 0.0, 42.0, 5.0, 0.1, key="run")
+            st.button("기록 (+50G/km)", key="b1", type="primary", use_container_width=True,
+                      on_click=add_xp_from, args=("run", 50, "🏃 달리기 {v}km"))
         with c2:
-            v2 = st.number_input("근력운동(회)", 0, 1000, 30, 10, key="gym")
-            if st.button("기록 (+0.5G/회)", key="b2", type="primary", use_container_width=True): 
-                if v2>0: add_xp(v2*0.5, f"💪 근력운동 {v2}회", v2)
+            st.number_input("근력운동(회)", 0, 1000, 30, 10, key="gym")
+            st.button("기록 (+0.5G/회)", key="b2", type="primary", use_container_width=True,
+                      on_click=add_xp_from, args=("gym", 0.5, "💪 근력운동 {v}회"))
 
     with t_brain:
         c3, c4 = st.columns(2)
         with c3:
-            v3 = st.number_input("자기계발(분)", 0, 1440, 60, 10, key="study")
-            if st.button("기록 (+1G/분)", key="b3", type="primary", use_container_width=True): 
-                if v3>0: add_xp(v3, f"🧠 자기계발 {v3}분", v3)
+            st.number_input("자기계발(분)", 0, 1440, 60, 10, key="study")
+            st.button("기록 (+1G/분)", key="b3", type="primary", use_container_width=True,
+                      on_click=add_xp_from, args=("study", 1, "🧠 자기계발 {v}분"))
         with c4:
-            v4 = st.number_input("독서(쪽)", 0, 1000, 10, 5, key="read")
-            if st.button("기록 (+1G/쪽)", key="b4", type="primary", use_container_width=True): 
-                if v4>0: add_xp(v4, f"📖 독서 {v4}쪽", v4)
+            st.number_input("독서(쪽)", 0, 1000, 10, 5, key="read")
+            st.button("기록 (+1G/쪽)", key="b4", type="primary", use_container_width=True,
+                      on_click=add_xp_from, args=("read", 1, "📖 독서 {v}쪽"))
 
     with t_routine:
         r1, r2, r3 = st.columns(3)
-        if r1.button("💰 무지출\n(20G)", type="primary", use_container_width=True): add_xp(20, "💰 무지출", 0)
-        if r2.button("💧 물 마시기\n(10G)", type="primary", use_container_width=True): add_xp(10, "💧 물 마시기", 0)
-        if r3.button("🧹 방 청소\n(15G)", type="primary", use_container_width=True): add_xp(15, "🧹 방 청소", 0)
+        r1.button("💰 무지출\n(20G)", type="primary", use_container_width=True, on_click=add_xp, args=(20, "💰 무지출", 0))
+        r2.button("💧 물 마시기\n(10G)", type="primary", use_container_width=True, on_click=add_xp, args=(10, "💧 물 마시기", 0))
+        r3.button("🧹 방 청소\n(15G)", type="primary", use_container_width=True, on_click=add_xp, args=(15, "🧹 방 청소", 0))
 
     with st.expander("📜 최근 기록 보기"):
-        if logs: st.dataframe(pd.DataFrame(logs)[['Time','Action','XP']], use_container_width=True)
-        if st.button("↩️ 마지막 기록 취소"): undo()
+        if logs: st.dataframe(pd.DataFrame(logs[:-501:-1])[['Time','Action','XP']], use_container_width=True)
+        st.button("↩️ 마지막 기록 취소", on_click=undo)
+
+with tab1, span("tab.growth", "render"): growth_section()
 
 # 2. 뽑기
-with tab2:
+with tab2, span("tab.gacha", "render"):
     st.markdown("### ❓ 운명의 뽑기 (1세대)")
     st.info(f"현재 보유 골드: **{gold} G**")
     
-    st.markdown("""
-    - **중복 환급:** 250G
+    st.markdown(f"""
+    - **중복 환급:** {PAYBACK}G
     - **✨ 이로치 확률:** **4% (1/25)**
     - **확률 보정:** 보유할수록 등장 확률 감소
     """)
     st.write("")
     
-    if st.button("🔮 500G 뽑기!", type="primary", use_container_width=True):
-        if gold >= 500:
-            all_ids = list(range(1, 152))
-            weights = []
-            for pid in all_ids:
-                count = my_pokemon_counts.get(pid, 0)
-                w = 1.0 / (2 ** count)
-                weights.append(w)
-            
-            pid = random.choices(all_ids, weights=weights, k=1)[0]
-            is_shiny = random.random() < 0.04
-            
-            k_name, rarity, p_type = get_poke_info_fast(pid)
-            current_count = my_pokemon_counts.get(pid, 0)
-            is_dup = current_count > 0
-            
-            process_gacha(pid, k_name, rarity, 500, p_type, is_dup, current_count, is_shiny)
-            
-        else: st.error("골드가 부족합니다! 성장 탭에서 운동하세요!")
-
-# 3. 도감 & 업적
-with tab3:
-    sub_t1, sub_t2 = st.tabs(["📖 전체 도감", "🏆 컬렉션 업적"])
+    c_one, c_ten = st.columns(2)
+    with c_one:
+        st.button(f"🔮 {PULL_COST}G 뽑기!", type="primary", use_container_width=True, on_click=try_pulls, args=(1,))
+    with c_ten:
+        st.button(f"🔮 10연차 ({10 * PULL_COST}G)", type="primary", use_container_width=True, on_click=try_pulls, args=(10,))
     
-    with sub_t1:
-        if 'dex_page' not in st.session_state: st.session_state['dex_page'] = 0
-        PER_PAGE = 24
-        
-        page = st.session_state['dex_page']
-        start = page * PER_PAGE + 1
-        end = min(start + PER_PAGE, 152)
-        
-        c_p1, c_p2, c_p3 = st.columns([1, 2, 1])
-        with c_p1: 
-            if page > 0: 
-                if st.button("◀"): st.session_state['dex_page'] -= 1; st.rerun()
-        with c_p2: st.markdown(f"<div style='text-align:center;'><b>No.{start} ~ {end-1}</b></div>", unsafe_allow_html=True)
-        with c_p3: 
-            if end < 151: 
-                if st.button("▶"): st.session_state['dex_page'] += 1; st.rerun()
-                
-        st.divider()
-        
-        poke_ids = list(range(start, end))
-        for i in range(0, len(poke_ids), 3):
-            row_cols = st.columns(3)
-            for j in range(3):
-                if i + j < len(poke_ids):
-                    pid = poke_ids[i+j]
-                    
-                    if pid in my_shinies:
-                        img_url = f"https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon/shiny/{pid}.png"
-                        box_class = "shiny-box"
-                    else:
-                        img_url = f"https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon/{pid}.png"
-                        box_class = "poke-box"
-                    
-                    with row_cols[j]:
-                        if pid in my_pokemon_counts:
-                            k_name = KOR_NAMES.get(pid, f"No.{pid}")
-                            if pid in my_shinies: k_name = f"🌟 {k_name}"
-                            st.markdown(f"""<div class="{box_class}"><img src="{img_url}" class="color-img"><div style="font-size:11px; font-weight:bold;">{k_name}</div></div>""", unsafe_allow_html=True)
-                        else:
-                            st.markdown(f"""<div class="poke-box" style="opacity:0.5;"><img src="{img_url}" class="shadow-img"><div style="font-size:11px; color:#ccc;">{pid}</div></div>""", unsafe_allow_html=True)
-
-    with sub_t2:
-        st.info("💡 실루엣을 보고 필요한 포켓몬을 모아보세요!")
-        
-        for p_set in COLLECTION_SETS:
-            collected = [pid for pid in p_set['ids'] if pid in my_pokemon_counts]
-            is_complete = len(collected) == len(p_set['ids'])
-            is_claimed = p_set['name'] in claimed_sets
-            
-            with st.container():
-                st.markdown(f"""
-                <div class="set-card">
-                    <div style="font-weight:bold; font-size:16px;">{p_set['name']} <span style='color:#D4AC0D; font-size:13px;'>({p_set['reward']}G)</span></div>
-                    <div style="font-size:12px; color:#666; margin-bottom:8px;">{p_set['desc']}</div>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                cols = st.columns(len(p_set['ids']))
-                for idx, pid in enumerate(p_set['ids']):
-                    img_url = f"https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon/{pid}.png"
-                    with cols[idx]:
-                        st.markdown(f"<div style='text-align:center;'><img src='{img_url}' class='shadow-img' style='width:35px;'></div>", unsafe_allow_html=True)
-                
-                st.write("")
-                col_btn, col_prog = st.columns([1, 2])
-                with col_btn:
-                    if is_claimed:
-                        st.button("✅ 완료", key=f"c_{p_set['name']}", disabled=True)
-                    elif is_complete:
-                        if st.button("🎁 받기", key=f"get_{p_set['name']}", type="primary"):
-                            claim_set_reward(p_set['name'], p_set['reward'])
-                    else:
-                        st.button("🔒 미달성", key=f"lk_{p_set['name']}", disabled=True)
-                with col_prog:
-                    st.progress(len(collected) / len(p_set['ids']))
-                    st.caption(f"{len(collected)} / {len(p_set['ids'])}")
+    with st.expander("🎲 N연차"):
+        n_pulls = st.number_input("뽑기 횟수", 1, 100, 20, 1, key="pull_n")
+        st.button(f"🔮 {n_pulls}연차 ({n_pulls * PULL_COST}G)", key="pull_nb", use_container_width=True, on_click=try_pulls_from, args=("pull_n",))
+    
+    if "pull_result" in st.session_state:
+        msg, names = st.session_state.pop("pull_result")
+        st.success(msg)
+        st.caption(names)
+
+# 3. 도감 & 업적 (각각 fragment: 페이지 넘기기는 도감만 다시 그린다)
+def flip_dex(delta):
+    st.session_state['dex_page'] += delta
+
+@st.fragment
+def dex_section():
+    if 'dex_page' not in st.session_state: st.session_state['dex_page'] = 0
+    PER_PAGE = 24
+    
+    page = st.session_state['dex_page']
+    start = page * PER_PAGE + 1
+    end = min(start + PER_PAGE, 152)
+    
+    c_p1, c_p2, c_p3 = st.columns([1, 2, 1])
+    with c_p1: 
+        if page > 0: st.button("◀", on_click=flip_dex, args=(-1,))
+    with c_p2: st.markdown(f"<div style='text-align:center;'><b>No.{start} ~ {end-1}</b></div>", unsafe_allow_html=True)
+    with c_p3: 
+        if end < 151: st.button("▶", on_click=flip_dex, args=(1,))
             
-            st.divider()
\ No newline at end of file
+    st.divider()
+    
+    # 24칸을 st.columns 대신 CSS grid 한 덩어리로
+    with span("dex.grid", "render"):
+        cells = dex_cells(list(range(start, end)), my_pokemon_counts, my_shinies, sprites)
+        st.markdown(f"<div class='dex-grid'>{''.join(cells)}</div>", unsafe_allow_html=True)
+
+@st.fragment
+def sets_section():
+    rerun_if_acted()
+    st.info("💡 실루엣을 보고 필요한 포켓몬을 모아보세요!")
+    set_ids = sorted({pid for p_set in COLLECTION_SETS for pid in p_set['ids']})
+    shadow_urls = dict(zip(set_ids, sprites.uris([("shadow", pid) for pid in set_ids])))
+    
+    for p_set in COLLECTION_SETS:
+        collected = [pid for pid in p_set['ids'] if pid in my_pokemon_counts]
+        is_claimed = p_set['name'] in claimed_sets
+        st.markdown(set_card(p_set, collected, shadow_urls, is_claimed), unsafe_allow_html=True)
+        # 받을 수 있는 카드에만 버튼
+        if not is_claimed and len(collected) == len(p_set['ids']):
+            st.button("🎁 받기", key=f"get_{p_set['name']}", type="primary",
+                      on_click=claim_set_reward, args=(p_set['name'], p_set['reward']))
+
+with tab3, span("tab.dex", "render"):
+    sub_t1, sub_t2 = st.tabs(["📖 전체 도감", "🏆 컬렉션 업적"])
+    with sub_t1: dex_section()
+    with sub_t2, span("dex.sets", "render"): sets_section()
+
+# [성능 디버그] 켜 두면 이번 rerun 의 구간별 시간을 보여 준다 (기록 파일은 항상 남는다)
+trace = profiling.end(st.session_state.pop("_trace"), trainer=trainer)
+with st.sidebar:
+    if st.toggle("🛠️ 성능 디버그", value=st.query_params.get("debug") == "1", key="debug"):
+        st.caption(f"rerun {trace.total_ms:.0f} ms · span {len(trace.spans)}개")
+        st.dataframe(pd.DataFrame([{"kind": k, **v} for k, v in trace.by_kind().items()]), hide_index=True, use_container_width=True)
+        st.dataframe(pd.DataFrame(trace.summary(), columns=["kind", "name", "count", "ms"]), hide_index=True, use_container_width=True)
+        if profiling.LOG_PATH: st.caption(f"JSON 기록: {profiling.LOG_PATH}")
+        st.caption("Sheets API 할당량 (프로세스 전체)")
+        st.json(get_quota().stats(), expanded=False)
\ No newline at end of file
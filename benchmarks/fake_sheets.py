@@ -0,0 +1,229 @@
+import random
+import re
+import threading
+import time
+from collections import Counter
+from datetime import date, timedelta
+
+# ==========================================
+# 가짜 gspread (벤치마크용)
+# ==========================================
+# 앱이 쓰는 Worksheet/Spreadsheet 메서드만 메모리 위에 흉내 낸다.
+# 호출마다 latency 초만큼 잠들고 calls 에 메서드 이름을 센다.
+# 값은 시트처럼 문자열로 저장한다 (5.0 -> "5").
+
+
+def _fmt(v):
+    if isinstance(v, float) and v.is_integer(): return str(int(v))
+    return str(v)
+
+
+class APICounter:
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = Counter()
+        self.lock = threading.Lock()
+
+    def hit(self, name):
+        with self.lock: self.calls[name] += 1
+        if self.latency: time.sleep(self.latency)
+
+    @property
+    def total(self):
+        return sum(self.calls.values())
+
+    def reset(self):
+        with self.lock: self.calls.clear()
+
+
+class FakeWorksheet:
+    def __init__(self, spreadsheet, title, sheet_id, rows=None):
+        self.spreadsheet = spreadsheet
+        self.title = title
+        self.id = sheet_id
+        self.values = [list(map(_fmt, r)) for r in rows or []]
+
+    @property
+    def api(self):
+        return self.spreadsheet.api
+
+    @property
+    def index(self):
+        return self.spreadsheet.order.index(self)
+
+    def get_all_values(self):
+        self.api.hit("get_all_values")
+        return [list(r) for r in self.values]
+
+    def get_all_records(self):
+        self.api.hit("get_all_records")
+        if not self.values: return []
+        header = self.values[0]
+        out = []
+        for row in self.values[1:]:
+            rec = {}
+            for k, v in zip(header, row):
+                try: rec[k] = int(v)
+                except ValueError:
+                    try: rec[k] = float(v)
+                    except ValueError: rec[k] = v
+            out.append(rec)
+        return out
+
+    def get(self, range_name):
+        self.api.hit("get")
+        m = re.match(r"A(\d+):([A-Z])(\d*)$", range_name)
+        start, width = int(m.group(1)), ord(m.group(2)) - ord("A") + 1
+        stop = int(m.group(3)) if m.group(3) else len(self.values)
+        return [r[:width] for r in self.values[start - 1:stop]]
+
+    # 실제 API 처럼 끝의 빈 칸은 잘린다
+    def col_values(self, col):
+        self.api.hit("col_values")
+        out = [r[col - 1] if len(r) >= col else "" for r in self.values]
+        while out and out[-1] == "": out.pop()
+        return out
+
+    def append_row(self, row, **kwargs):
+        self.api.hit("append_row")
+        self.values.append(list(map(_fmt, row)))
+
+    def append_rows(self, rows, **kwargs):
+        self.api.hit("append_rows")
+        self.values.extend(list(map(_fmt, r)) for r in rows)
+
+    def delete_rows(self, start, end=None):
+        self.api.hit("delete_rows")
+        del self.values[start - 1:(end or start)]
+
+    def update_cell(self, row, col, value):
+        self.api.hit("update_cell")
+
+    def batch_update(self, data, **kwargs):
+        self.api.hit("batch_update")
+
+
+class FakeSpreadsheet:
+    def __init__(self, latency=0.0):
+        self.api = APICounter(latency)
+        self.order = []         # 탭 순서
+        self.next_id = 0
+
+    # 제목 -> 워크시트 (이름을 바꿔도 맞게 매번 만든다)
+    @property
+    def sheets(self):
+        return {ws.title: ws for ws in self.order}
+
+    def add_worksheet(self, title, rows=0, cols=0, values=None):
+        self.api.hit("add_worksheet")
+        if title in self.sheets: raise ValueError(f"A sheet with the name \"{title}\" already exists")
+        ws = FakeWorksheet(self, title, self.next_id, values)
+        self.next_id += 1
+        self.order.append(ws)
+        return ws
+
+    def del_worksheet(self, worksheet):
+        self.api.hit("del_worksheet")
+        self.order = [ws for ws in self.order if ws.id != worksheet.id]
+
+    # deleteSheet / updateSheetProperties (title, index) 만. 실제 API 처럼 하나라도 틀리면 아무것도 바꾸지 않는다
+    def batch_update(self, body):
+        self.api.hit("batch_update")
+        order, titles = list(self.order), {ws.id: ws.title for ws in self.order}
+        for req in body["requests"]:
+            if "deleteSheet" in req:
+                sid = req["deleteSheet"]["sheetId"]
+                if sid not in titles: raise ValueError(f"No grid with id: {sid}")
+                order = [ws for ws in order if ws.id != sid]
+                del titles[sid]
+            elif "updateSheetProperties" in req:
+                props = req["updateSheetProperties"]["properties"]
+                fields = req["updateSheetProperties"]["fields"].split(",")
+                ws = next((ws for ws in order if ws.id == props["sheetId"]), None)
+                if ws is None: raise ValueError(f"No grid with id: {props['sheetId']}")
+                if "title" in fields:
+                    if props["title"] in (t for i, t in titles.items() if i != ws.id):
+                        raise ValueError(f"A sheet with the name \"{props['title']}\" already exists")
+                    titles[ws.id] = props["title"]
+                if "index" in fields:
+                    order.remove(ws)
+                    order.insert(props["index"], ws)
+            else:
+                raise ValueError(f"unsupported request: {list(req)}")
+        for ws in order: ws.title = titles[ws.id]
+        self.order = order
+        return {"replies": [{} for _ in body["requests"]]}
+
+    def worksheet(self, title):
+        self.api.hit("worksheet")
+        return self.sheets[title]
+
+    def worksheets(self):
+        self.api.hit("worksheets")
+        return list(self.order)
+
+    # ranges = ["'Logs'!A:D", ...]. 없는 시트가 있으면 실제 API 처럼 통째로 실패
+    def values_batch_get(self, ranges, params=None):
+        self.api.hit("values_batch_get")
+        out = []
+        for rng in ranges:
+            title, cols = rng.rsplit("!", 1)
+            title = title.strip("'")
+            if title not in self.sheets: raise ValueError(f"Unable to parse range: {rng}")
+            width = ord(cols.split(":")[1][0]) - ord("A") + 1
+            values = [r[:width] for r in self.sheets[title].values]
+            out.append({"range": rng, "values": values} if values else {"range": rng})
+        return {"valueRanges": out}
+
+
+# ==========================================
+# 합성 기록
+# ==========================================
+ACTIONS = [
+    (lambda r: (r.choice([3.0, 5.0, 7.5, 10.0]), "🏃 달리기 {v}km", 50)),
+    (lambda r: (r.choice([30, 50, 100]), "💪 근력운동 {v}회", 0.5)),
+    (lambda r: (r.choice([30, 60, 90]), "🧠 자기계발 {v}분", 1)),
+    (lambda r: (r.choice([10, 20, 40]), "📖 독서 {v}쪽", 1)),
+    (lambda r: (0, "💰 무지출", 20)),
+    (lambda r: (0, "💧 물 마시기", 10)),
+    (lambda r: (0, "🧹 방 청소", 15)),
+]
+
+
+# n 개의 로그를 하루 1~8건씩, 오늘에서 끝나도록 만든다
+def make_logs(n, seed=0, today=None):
+    r = random.Random(seed)
+    today = today or date.today()
+    per_day = [r.randint(1, 8) for _ in range(n)]
+    days, total = 0, 0
+    while total < n:
+        total += per_day[days]; days += 1
+    d = today - timedelta(days=days - 1)
+    rows, i = [], 0
+    for k in range(days):
+        for j in range(per_day[k]):
+            if len(rows) >= n: break
+            v, label, rate = r.choice(ACTIONS)(r)
+            xp = int(v * rate) if v else rate
+            rows.append([f"{d.isoformat()} {8 + j:02d}:{r.randint(0, 59):02d}:00", label.format(v=v), xp, v])
+        d += timedelta(days=1)
+    return rows
+
+
+def make_collection(n, seed=0):
+    r = random.Random(seed)
+    rows = []
+    for _ in range(n):
+        pid = r.randint(1, 151)
+        rarity = "Shiny" if r.random() < 0.04 else "Normal"
+        rows.append([pid, f"No.{pid}", "2026-01-01", rarity, 500, "normal"])
+    return rows
+
+
+def make_spreadsheet(n_logs, n_cols, latency=0.0, seed=0):
+    sh = FakeSpreadsheet(latency)
+    sh.add_worksheet("Status", values=[["Level"], [1]])
+    sh.add_worksheet("Logs", values=[["Time", "Action", "XP", "Value"]] + make_logs(n_logs, seed))
+    sh.add_worksheet("Collection", values=[["ID", "Name", "Date", "Rarity", "Cost", "Type"]] + make_collection(n_cols, seed))
+    sh.api.reset()
+    return sh
@@ -0,0 +1,199 @@
+import argparse
+import heapq
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_sheets import make_spreadsheet, make_logs
+from storage import SheetsStorage, open_sheets
+from game_state import GameState
+from rollups import growth_frames
+
+# ==========================================
+# 핫패스 벤치마크
+# ==========================================
+# python -m benchmarks.run --sizes 10000 100000 1000000 --latency 0.05
+#
+# 시나리오마다 rerun 한 번에 해당하는 작업의
+#   - 벽시계 시간 (reps 회 중앙값, ms)
+#   - 가짜 Sheets API 호출 수
+#   - 최대 메모리 (tracemalloc, KB — 시간 측정과는 따로 한 번 더 돌려서 잰다)
+# 를 보고한다. legacy 시나리오는 예전 코드 경로를 그대로 옮겨 둔 기준선.
+
+
+# ---------- 예전 코드 경로 (기준선) ----------
+def legacy_load_data(ws_logs, ws_col):
+    logs_data = ws_logs.get_all_records()
+    col_data = ws_col.get_all_values()
+    total_xp = 0
+    claimed_sets = set()
+    for log in logs_data:
+        try:
+            xp = int(log.get("XP", 0))
+            act = log.get("Action", "")
+            total_xp += xp
+            if "[업적 달성]" in act: claimed_sets.add(act.split("] ")[1])
+        except Exception: continue
+    used_gold, counts, shinies = 0, {}, set()
+    for row in col_data[1:]:
+        try:
+            pid = int(row[0]); cost = int(row[4])
+            used_gold += cost
+            counts[pid] = counts.get(pid, 0) + 1
+            if "Shiny" in row[3]: shinies.add(pid)
+        except Exception: continue
+    level, temp = 1, total_xp
+    while temp >= level * 100:
+        temp -= level * 100
+        level += 1
+    logs_data.reverse()
+    return level, temp, total_xp, total_xp - used_gold, logs_data, counts, shinies, claimed_sets
+
+
+def legacy_cold_start(sh):
+    ws_status, ws_logs, ws_col = [sh.worksheet(t) for t in ("Status", "Logs", "Collection")]
+    return legacy_load_data(ws_logs, ws_col)
+
+
+def legacy_streak(logs_data, now):
+    dates = sorted(set(log["Time"].split(" ")[0] for log in logs_data), reverse=True)
+    if not dates: return 0
+    streak = 0
+    today_str = now.strftime("%Y-%m-%d")
+    check_date = now if dates[0] == today_str else now - timedelta(days=1)
+    for _ in range(len(dates)):
+        if (check_date - timedelta(days=streak)).strftime("%Y-%m-%d") in dates: streak += 1
+        else: break
+    return streak
+
+
+def legacy_daily_chart(logs_data):
+    import pandas as pd
+    df = pd.DataFrame(logs_data)
+    df["Date"] = df["Time"].apply(lambda x: x.split(" ")[0])
+    return df.groupby("Date")["XP"].sum().tail(7)
+
+
+def bucket_daily_chart(state):
+    import pandas as pd
+    days = sorted(heapq.nlargest(7, state.daily_xp))
+    return pd.Series([state.daily_xp[d] for d in days], index=pd.Index(days, name="Date"), name="XP")
+
+
+# ---------- 측정 ----------
+def measure(name, size, api, fn, setup=lambda: (), reps=5):
+    times, calls = [], []
+    for _ in range(reps):
+        args = setup()
+        api.reset() if api else None
+        t0 = time.perf_counter()
+        fn(*args)
+        times.append((time.perf_counter() - t0) * 1000)
+        calls.append(api.total if api else 0)
+    args = setup()
+    tracemalloc.start()
+    fn(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"scenario": name, "rows": size, "wall_ms": round(statistics.median(times), 3),
+            "api_calls": max(calls), "peak_kb": round(peak / 1024, 1)}
+
+
+def run_size(n, latency, reps, tmp):
+    results = []
+    sh = make_spreadsheet(n, max(n // 20, 1), latency)
+    ws_status, ws_logs, ws_col = sh.sheets["Status"], sh.sheets["Logs"], sh.sheets["Collection"]
+    now = datetime.now()
+    today = now.strftime("%Y-%m-%d")
+
+    results.append(measure("cold start (legacy)", n, sh.api, lambda: legacy_cold_start(sh), reps=reps))
+
+    def cold_start():
+        ws, values = open_sheets(sh, {k: k for k in ("Status", "Logs", "Collection")})
+        storage = SheetsStorage(ws["Status"], ws["Logs"], ws["Collection"], os.path.join(tmp, f"start_{n}.jsonl"),
+                                max_age=2.0, initial=values)
+        GameState().sync(*storage.read_all())
+    results.append(measure("cold start (batch get, seeded)", n, sh.api, cold_start, reps=reps))
+
+    results.append(measure("load_data (legacy full read)", n, sh.api,
+                           lambda: legacy_load_data(ws_logs, ws_col), reps=reps))
+
+    def cold():
+        storage = SheetsStorage(ws_status, ws_logs, ws_col, os.path.join(tmp, f"cold_{n}.jsonl"))
+        GameState().sync(*storage.read_all())
+    results.append(measure("load_data (cold sync)", n, sh.api, cold, reps=reps))
+
+    storage = SheetsStorage(ws_status, ws_logs, ws_col, os.path.join(tmp, f"warm_{n}.jsonl"))
+    state = GameState().sync(*storage.read_all())
+    extra = iter(make_logs(reps + 1, seed=n))
+
+    def one_new_log():
+        storage.append_log(next(extra))
+        storage.journal.flush()
+        return ()
+    results.append(measure("load_data (warm, +1 row)", n, sh.api,
+                           lambda: state.sync(*storage.read_all()), setup=one_new_log, reps=reps))
+
+    logs_desc = state.logs[::-1]
+    results.append(measure("get_streak (legacy)", n, None, lambda: legacy_streak(logs_desc, now), reps=reps))
+    results.append(measure("streak (state)", n, None, lambda: state.streak(today), reps=reps))
+
+    try:
+        import pandas  # noqa: F401
+        results.append(measure("daily chart (legacy groupby)", n, None, lambda: legacy_daily_chart(logs_desc), reps=reps))
+        results.append(measure("daily chart (buckets)", n, None, lambda: bucket_daily_chart(state), reps=reps))
+        results.append(measure("growth analytics (monthly, all)", n, None, lambda: growth_frames(state.rollups, "month"), reps=reps))
+    except ImportError:
+        print("  pandas 없음: 차트 시나리오 건너뜀", file=sys.stderr)
+
+    results.append(dex_render(n, state, tmp, reps))
+    return [r for r in results if r]
+
+
+def dex_render(n, state, tmp, reps):
+    try:
+        from sprites import SpriteStore
+        from views import dex_cells
+    except ImportError as e:
+        print(f"  {e.name} 없음: 도감 시나리오 건너뜀", file=sys.stderr)
+        return None
+    store = SpriteStore(os.path.join(tmp, "sprites"))
+    png = b"\x89PNG\r\n\x1a\n" + b"\0" * 2000     # 디코딩하지 않으므로 크기만 비슷하게
+    for kind in ("normal", "shiny", "shadow"):
+        for pid in range(1, 152):
+            with open(store.path(kind, pid), "wb") as f: f.write(png)
+    ids = list(range(1, 25))
+    return measure("dex page render (24 cells)", n, None,
+                   lambda: "".join(dex_cells(ids, state.pokemon_counts, state.shinies, store)), reps=reps)
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="관희 RPG 핫패스 벤치마크")
+    p.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    p.add_argument("--latency", type=float, default=0.0, help="가짜 Sheets API 호출당 지연 (초)")
+    p.add_argument("--reps", type=int, default=5)
+    p.add_argument("--json", help="결과를 JSON 으로 저장할 경로")
+    args = p.parse_args(argv)
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.sizes:
+            print(f"== {n:,} rows (latency {args.latency * 1000:.0f}ms/call)", file=sys.stderr)
+            rows += run_size(n, args.latency, args.reps, tmp)
+
+    print(f"{'scenario':34} {'rows':>9} {'wall_ms':>10} {'api':>5} {'peak_kb':>10}")
+    for r in rows:
+        print(f"{r['scenario']:34} {r['rows']:>9,} {r['wall_ms']:>10.3f} {r['api_calls']:>5} {r['peak_kb']:>10.1f}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f: json.dump(rows, f, ensure_ascii=False, indent=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+import hashlib
+import json
+import re
+from datetime import date
+
+# ==========================================
+# 로그 압축 (체크포인트)
+# ==========================================
+# cutoff 날짜 이전의 원본 로그를 날짜별 요약 행 하나로 합치고,
+# 그 뒤에 체크포인트 행 하나를 둔다. 원본은 아카이브로 옮긴다.
+#
+#   [일일 요약] ×5      XP = 그날 XP 합 (7일 그래프 / 스트릭용)
+#   [체크포인트] {"xp": 누적 XP, "sets": [달성 업적], "rows": 압축된 원본 수, "through": 마지막 날짜,
+#                "months": {"YYYY-MM": {활동 종류: [XP, 횟수, 수치]}}, "batch": 마지막으로 옮긴 묶음 id}
+#
+# 총 XP / 업적 / 월별 활동 누적은 체크포인트 하나에서 가져오고, 요약 행은 일별 XP 에만 쓴다.
+# 그래서 시트에는 하루에 한 행만 남는다 (활동 종류별 내역은 체크포인트의 months 와 아카이브).
+SUMMARY_PREFIX = "[일일 요약] "
+CHECKPOINT_PREFIX = "[체크포인트] "
+CLAIM_PREFIX = "[업적 달성] "
+COMPACTED_KIND = "🗜️ 압축된 기록"     # 날짜별 요약 행의 활동 종류 (일/주 분석에 이렇게 보인다)
+
+_SUMMARY_RE = re.compile(r"^\[일일 요약\] ×(\d+)$")
+
+
+def is_meta(act):
+    act = str(act)
+    return act.startswith(SUMMARY_PREFIX) or act.startswith(CHECKPOINT_PREFIX)
+
+
+# "🏃 달리기 5.0km" -> "🏃 달리기", "♻️ 페이백 (피카츄)" -> "♻️ 페이백"
+def action_kind(act):
+    act = str(act)
+    if act.startswith(CLAIM_PREFIX): return CLAIM_PREFIX.strip()
+    if _SUMMARY_RE.match(act): return COMPACTED_KIND
+    act = re.sub(r"\s*\(.*\)$", "", act)
+    return re.sub(r"\s+[\d.]+\S*$", "", act).strip()
+
+
+def summary_count(act):
+    m = _SUMMARY_RE.match(str(act))
+    return int(m.group(1)) if m else 1
+
+
+def parse_checkpoint(act):
+    try: return json.loads(str(act)[len(CHECKPOINT_PREFIX):])
+    except ValueError: return {}
+
+
+def _num(v):
+    try: return float(v)
+    except (TypeError, ValueError): return 0.0
+
+
+def _day(log):
+    day = str(log.get("Time", "")).split(" ")[0]
+    try: date.fromisoformat(day)
+    except ValueError: return None
+    return day
+
+
+# 옮길 원본 행들로 정해지는 묶음 id. 같은 로그를 다시 압축하면 같은 id (아카이브에 이미 있으면 건너뛴다)
+def batch_id(archived):
+    return hashlib.sha1(json.dumps(archived, ensure_ascii=False, default=str).encode()).hexdigest()[:12]
+
+
+def _bump(months, month, kind, xp, n, value):
+    b = months.setdefault(month, {}).setdefault(kind, [0, 0, 0.0])
+    b[0] += xp
+    b[1] += n
+    b[2] = round(b[2] + value, 2)
+
+
+# logs: 시간순 records -> (새 Logs 행들, 아카이브로 옮길 원본 행들). 행은 [Time, Action, XP, Value]
+def compact(logs, cutoff_day):
+    kept, archived = [], []
+    checkpoint = {"xp": 0, "sets": [], "rows": 0, "through": None, "months": {}}
+    days = {}       # day -> [xp, n]
+    for log in logs:
+        act = str(log.get("Action", ""))
+        row = [log.get("Time", ""), act, log.get("XP", 0), log.get("Value", 0)]
+        if act.startswith(CHECKPOINT_PREFIX):
+            prev = parse_checkpoint(act)
+            checkpoint["xp"] += int(_num(prev.get("xp", 0)))
+            checkpoint["sets"] += [s for s in prev.get("sets", []) if s not in checkpoint["sets"]]
+            checkpoint["rows"] += int(prev.get("rows", 0))
+            checkpoint["through"] = max(filter(None, [checkpoint["through"], prev.get("through")]), default=None)
+            for month, kinds in prev.get("months", {}).items():
+                for kind, (xp, n, value) in kinds.items(): _bump(checkpoint["months"], month, kind, xp, n, value)
+            continue
+        day = _day(log)
+        m = _SUMMARY_RE.match(act)
+        if m and day:
+            # 이미 요약된 날. XP 는 그때 체크포인트에 들어갔다
+            d = days.setdefault(day, [0, 0])
+            d[0] += int(_num(log.get("XP", 0)))
+            d[1] += int(m.group(1))
+            checkpoint["through"] = max(filter(None, [checkpoint["through"], day]))
+            continue
+        if day is None or day >= cutoff_day:
+            kept.append(row)
+            continue
+        archived.append(row)
+        xp = int(_num(log.get("XP", 0)))
+        d = days.setdefault(day, [0, 0])
+        d[0] += xp
+        d[1] += 1
+        _bump(checkpoint["months"], day[:7], action_kind(act), xp, 1, _num(log.get("Value", 0)))
+        checkpoint["xp"] += xp
+        checkpoint["rows"] += 1
+        checkpoint["through"] = max(filter(None, [checkpoint["through"], day]))
+        if act.startswith(CLAIM_PREFIX) and act[len(CLAIM_PREFIX):] not in checkpoint["sets"]:
+            checkpoint["sets"].append(act[len(CLAIM_PREFIX):])
+
+    if archived: checkpoint["batch"] = batch_id(archived)
+    new_rows = [[f"{day} 23:59:59", f"{SUMMARY_PREFIX}×{n}", xp, 0] for day, (xp, n) in sorted(days.items())]
+    if checkpoint["through"] is not None:
+        new_rows.append([f"{checkpoint['through']} 23:59:59", CHECKPOINT_PREFIX + json.dumps(checkpoint, ensure_ascii=False), 0, 0])
+    return new_rows + kept, archived
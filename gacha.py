@@ -0,0 +1,64 @@
+import random
+
+# ==========================================
+# 뽑기 규칙
+# ==========================================
+# 보유 수가 count 인 포켓몬의 가중치는 1 / WEIGHT_DECAY**count (기본 2).
+# 여러 번 뽑을 때는 한 번 뽑을 때마다 그 포켓몬의 가중치를 그만큼 줄인다.
+PULL_COST = 500
+PAYBACK = 250
+SHINY_RATE = 0.04
+ALL_IDS = list(range(1, 152))
+WEIGHT_DECAY = 2        # 한 마리 더 가질 때마다 가중치가 1/WEIGHT_DECAY 로
+
+
+def pull_weight(count):
+    return 1.0 / (WEIGHT_DECAY ** count)
+
+
+# [(pid, is_duplicate, is_shiny), ...]
+def draw(counts, n, rng=random):
+    counts = dict(counts)
+    weights = [pull_weight(counts.get(pid, 0)) for pid in ALL_IDS]
+    results = []
+    for _ in range(n):
+        i = rng.choices(range(len(ALL_IDS)), weights=weights, k=1)[0]
+        pid = ALL_IDS[i]
+        c = counts.get(pid, 0)
+        results.append((pid, c > 0, rng.random() < SHINY_RATE))
+        counts[pid] = c + 1
+        weights[i] /= WEIGHT_DECAY
+    return results
+
+
+# 뽑기 결과 -> (Collection 행들, 페이백 Log 행들). info(pid) -> (이름, 희귀도, 타입)
+def pull_rows(results, info, date_str, ts):
+    col_rows, log_rows = [], []
+    for pid, is_dup, is_shiny in results:
+        name, rarity, p_type = info(pid)
+        if is_shiny:
+            rarity = "Shiny"
+            name = f"🌟 {name}"
+        col_rows.append([pid, name, date_str, rarity, PULL_COST, p_type])
+        if is_dup and not is_shiny:
+            log_rows.append([ts, f"♻️ 페이백 ({name})", PAYBACK, 0])
+    return col_rows, log_rows
+
+
+# ==========================================
+# 컬렉션 업적 (세트를 다 모으면 보상)
+# ==========================================
+COLLECTION_SETS = [
+    {"name": "태초마을의 시작", "desc": "오박사님이 주신 선택받은 세 마리.", "ids": [1, 4, 7], "reward": 1000},
+    {"name": "상록숲의 악몽", "desc": "풀숲에 들어가면 끝도 없이 나오는 친구들.", "ids": [10, 13, 16, 19], "reward": 500},
+    {"name": "니드런 왕실", "desc": "왕과 여왕, 그리고 그들의 아이들.", "ids": [29, 32, 31, 34], "reward": 1200},
+    {"name": "이브이 4형제", "desc": "가능성은 무한대! 진화의 돌이 필요해.", "ids": [133, 134, 135, 136], "reward": 1500},
+    {"name": "곤충 채집 소년", "desc": "상록숲의 진정한 지배자들.", "ids": [12, 15, 49, 123, 127], "reward": 1000},
+    {"name": "로켓단의 음모", "desc": "이 세계의 파괴를 막기 위해!", "ids": [23, 24, 52, 109, 110], "reward": 1200},
+    {"name": "격투 도장", "desc": "노란시티 격투 도장의 챔피언들.", "ids": [57, 68, 106, 107], "reward": 1500},
+    {"name": "초능력자", "desc": "숟가락 구부리기의 달인들.", "ids": [65, 97, 122], "reward": 1500},
+    {"name": "폭포오르기", "desc": "약한 잉어킹이 흉폭한 용이 되기까지.", "ids": [129, 130], "reward": 1000},
+    {"name": "고대 화석의 비밀", "desc": "박물관에서 되살려낸 고대의 존재.", "ids": [139, 141, 142], "reward": 2000},
+    {"name": "전설의 새", "desc": "관동 지방 하늘을 지배하는 전설.", "ids": [144, 145, 146], "reward": 3000},
+    {"name": "최강의 유전자", "desc": "환상의 포켓몬과 그 복제물.", "ids": [150, 151], "reward": 5000}
+]
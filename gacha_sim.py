@@ -0,0 +1,179 @@
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import gacha
+from gacha import PULL_COST, PAYBACK, SHINY_RATE, WEIGHT_DECAY, ALL_IDS, COLLECTION_SETS, draw
+
+# ==========================================
+# 뽑기 경제 시뮬레이터
+# ==========================================
+# python gacha_sim.py --trials 1000000 --workers 8
+# python gacha_sim.py --decay 1.5 2 3 --cost 400 500 --payback 200 250 --shiny 0.02 0.04 --json sweep.json
+#
+# gacha.draw 와 같은 규칙 (가중치 1 / WEIGHT_DECAY**보유수, 뽑을 때마다 그 포켓몬만 줄어든다) 을
+# 한 번에 한 장씩 따라가지 않고 "지수 시계 경주" 로 바꿔서 배열로 한꺼번에 계산한다.
+#   가중치 w 인 포켓몬마다 Exp(rate=w) 시계를 두면, 가장 먼저 울린 시계가 뽑힐 확률이 w / Σw 이다.
+#   뽑힌 포켓몬만 rate 가 1/decay 배가 되고, 나머지는 무기억성 때문에 그대로 두어도 된다.
+#   -> 포켓몬 i 의 k 번째 등장 시각 = Σ_{j<k} decay**j * E_ij  (E ~ Exp(1))
+#   -> 세트가 완성되는 시각 T = 세트 멤버 첫 등장 시각의 최댓값,
+#      그때까지 뽑은 수 = 모든 포켓몬의 (등장 시각 <= T) 개수
+# 등장 시각은 LEVELS 단계까지 먼저 만들고, 도감이 끝나기 전에 어떤 포켓몬이 마지막 단계까지 다 나온
+# 시행만 단계를 두 배로 늘려 (같은 시계를 이어서) 다시 센다 -> 잘린 시행 없이 모든 decay 에서 정확하다.
+# 골드 (비용/페이백/이로치 확률/세트 보상) 는 뽑은 수와 중복 수로 계산하므로 다시 뽑지 않고 바꿔 볼 수 있다.
+LEVELS = 8
+CHUNK = 20_000      # 한 번에 (LEVELS, CHUNK, 151) float32 배열 (약 100MB)
+
+
+def targets(sets=COLLECTION_SETS):
+    names = ["📖 도감 완성"] + [s["name"] for s in sets]
+    idx = [np.arange(len(ALL_IDS))] + [np.array([ALL_IDS.index(pid) for pid in s["ids"]]) for s in sets]
+    # 도감을 다 채우면 모든 세트 보상도 받은 것
+    rewards = [sum(s["reward"] for s in sets)] + [s["reward"] for s in sets]
+    return names, idx, rewards
+
+
+# (L, n, 151) 등장 시각 뒤에 levels 단계를 이어 붙인다.
+# 등장 순서를 맨 앞 축에 두어야 누적합이 연속 메모리 덧셈이 된다
+def _extend(rng, arrivals, decay, levels):
+    done, n, m = arrivals.shape
+    more = rng.standard_exponential((levels, n, m), dtype=np.float32)
+    for k in range(levels):
+        more[k] *= np.float32(float(decay) ** (done + k))
+        if k: more[k] += more[k - 1]
+        elif done: more[k] += arrivals[-1]
+    return np.concatenate([arrivals, more])
+
+
+def _count(arrivals, idx):
+    first = arrivals[0]
+    pulls = np.empty((first.shape[0], len(idx)), np.int32)
+    dups = np.empty_like(pulls)
+    for t, ids in enumerate(idx):
+        done_at = first[:, ids].max(axis=1)[:, None]
+        got = arrivals <= done_at
+        pulls[:, t] = np.count_nonzero(got, axis=(0, 2))
+        dups[:, t] = pulls[:, t] - np.count_nonzero(got[0], axis=1)
+    return pulls, dups
+
+
+def _simulate_chunk(n, decay, seed, sets):
+    rng = np.random.default_rng(seed)
+    _, idx, _ = targets(sets)
+    arrivals = _extend(rng, np.empty((0, n, len(ALL_IDS)), np.float32), decay, LEVELS)
+    pulls = np.empty((n, len(idx)), np.int32)
+    dups = np.empty_like(pulls)
+    rows = np.arange(n)
+    extended = np.zeros(n, bool)
+    while True:
+        # 도감 완성 (모든 목표 중 가장 늦다) 전에 마지막 단계까지 다 나온 포켓몬이 있으면 그 시행은 아직 모른다
+        cut = (arrivals[-1] <= arrivals[0].max(axis=1)[:, None]).any(axis=1)
+        if not cut.any():
+            pulls[rows], dups[rows] = _count(arrivals, idx)
+            return pulls, dups, int(extended.sum())
+        pulls[rows[~cut]], dups[rows[~cut]] = _count(arrivals[:, ~cut], idx)
+        rows = rows[cut]
+        extended[rows] = True
+        arrivals = _extend(rng, arrivals[:, cut], decay, len(arrivals))
+
+
+# -> (pulls (trials, 목표 수), dups (같은 모양), 단계를 늘려 이어서 센 시행 수). 목표 순서는 targets() 와 같다
+def simulate(trials, decay=WEIGHT_DECAY, seed=None, workers=1, sets=COLLECTION_SETS):
+    # decay < 1 이면 한 포켓몬이 유한 시간 안에 끝없이 나올 수 있다 (단계를 늘려도 끝나지 않는다)
+    if decay < 1: raise ValueError(f"decay 는 1 이상이어야 합니다: {decay}")
+    sizes = [CHUNK] * (trials // CHUNK) + ([trials % CHUNK] if trials % CHUNK else [])
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(n, decay, s, sets) for n, s in zip(sizes, seeds)]
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(workers) as ex:
+            parts = list(ex.map(_simulate_chunk, *zip(*jobs)))
+    else:
+        parts = [_simulate_chunk(*job) for job in jobs]
+    return (np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts]),
+            sum(p[2] for p in parts))
+
+
+# 중복이지만 이로치가 아닌 것만 페이백 (gacha.pull_rows 와 같다)
+def gold_spent(pulls, dups, cost=PULL_COST, payback=PAYBACK, shiny=SHINY_RATE, seed=None):
+    rng = np.random.default_rng(seed)
+    return pulls.astype(np.int64) * cost - rng.binomial(dups, 1 - shiny).astype(np.int64) * payback
+
+
+def _dist(a):
+    p10, p50, p90 = np.percentile(a, [10, 50, 90], axis=0)
+    return {"mean": round(float(a.mean()), 1), "p10": float(p10), "p50": float(p50), "p90": float(p90)}
+
+
+def report(pulls, dups, cost=PULL_COST, payback=PAYBACK, shiny=SHINY_RATE, sets=COLLECTION_SETS, seed=None):
+    names, _, rewards = targets(sets)
+    gold = gold_spent(pulls, dups, cost, payback, shiny, seed)
+    rows = []
+    for t, name in enumerate(names):
+        rows.append({"target": name, "reward": rewards[t], "pulls": _dist(pulls[:, t]),
+                     "gold": _dist(gold[:, t]), "net_gold": _dist(gold[:, t] - rewards[t])})
+    return rows
+
+
+# gacha.draw 를 그대로 한 장씩 돌려서 도감 완성까지 뽑은 수 (시뮬레이터 검증용)
+def draw_until_complete(rng):
+    counts, pulls = {}, 0
+    while len(counts) < len(ALL_IDS):
+        (pid, _, _), = draw(counts, 1, rng)
+        counts[pid] = counts.get(pid, 0) + 1
+        pulls += 1
+    return pulls
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="관희 RPG 뽑기 경제 시뮬레이터")
+    p.add_argument("--trials", type=int, default=200_000)
+    p.add_argument("--decay", type=float, nargs="+", default=[WEIGHT_DECAY], help="가중치 감소 배율 (1/decay**보유수)")
+    p.add_argument("--cost", type=int, nargs="+", default=[PULL_COST])
+    p.add_argument("--payback", type=int, nargs="+", default=[PAYBACK])
+    p.add_argument("--shiny", type=float, nargs="+", default=[SHINY_RATE])
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    p.add_argument("--seed", type=int, default=None)
+    p.add_argument("--check", type=int, default=0, help="gacha.draw 로 N번 직접 돌려 도감 완성 평균과 비교")
+    p.add_argument("--json", help="결과를 JSON 으로 저장할 경로")
+    args = p.parse_args(argv)
+
+    configs = list(itertools.product(args.cost, args.payback, args.shiny))
+    sweep = len(args.decay) * len(configs) > 1
+    out = []
+    t0 = time.perf_counter()
+    for decay in args.decay:
+        pulls, dups, extended = simulate(args.trials, decay, args.seed, args.workers)
+        if extended: print(f"  decay {decay}: {extended:,}회는 한 포켓몬이 {LEVELS}번 넘게 나와 단계를 늘려 이어서 셈", file=sys.stderr)
+        for cost, payback, shiny in configs:
+            rows = report(pulls, dups, cost, payback, shiny, seed=args.seed)
+            out.append({"decay": decay, "cost": cost, "payback": payback, "shiny": shiny, "trials": args.trials, "targets": rows})
+    elapsed = time.perf_counter() - t0
+
+    for r in out:
+        print(f"== decay {r['decay']:g} · {r['cost']}G · 페이백 {r['payback']}G · 이로치 {r['shiny']:.0%}")
+        print(f"  {'목표':16} {'뽑기 p50 (p10~p90)':>22} {'골드 p50':>10} {'보상 뺀 p50':>12}")
+        for t in r["targets"][:1] if sweep else r["targets"]:
+            pl, g, ng = t["pulls"], t["gold"], t["net_gold"]
+            print(f"  {t['target']:16} {pl['p50']:>8.0f} ({pl['p10']:.0f}~{pl['p90']:.0f}) {g['p50']:>10,.0f} {ng['p50']:>12,.0f}")
+    print(f"{len(args.decay)}개 분포 x {args.trials:,}회, 조합 {len(out)}개: {elapsed:.1f}s", file=sys.stderr)
+
+    for decay in args.decay if args.check else []:
+        # gacha.draw 는 모듈 상수 WEIGHT_DECAY 를 읽는다
+        rng, saved, gacha.WEIGHT_DECAY = random.Random(args.seed), gacha.WEIGHT_DECAY, decay
+        try: seq = [draw_until_complete(rng) for _ in range(args.check)]
+        finally: gacha.WEIGHT_DECAY = saved
+        vec = simulate(min(args.trials, 100_000), decay, args.seed, args.workers)[0][:, 0]
+        print(f"검증 (decay {decay:g}): gacha.draw {np.mean(seq):.1f} ± {np.std(seq) / len(seq) ** 0.5:.1f}회 (p50 {np.median(seq):.0f}), "
+              f"시뮬레이터 {vec.mean():.1f}회 (p50 {np.median(vec):.0f})", file=sys.stderr)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f: json.dump(out, f, ensure_ascii=False, indent=1)
+
+
+if __name__ == "__main__":
+    main()
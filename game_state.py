@@ -0,0 +1,177 @@
+import bisect
+import threading
+from collections import Counter
+from datetime import date, timedelta
+from math import isqrt
+from compaction import CLAIM_PREFIX, CHECKPOINT_PREFIX, SUMMARY_PREFIX, parse_checkpoint
+from rollups import Rollups
+
+# ==========================================
+# 파생 상태 (XP / 골드 / 레벨 / 스트릭 / 도감 집계)
+# ==========================================
+# 로그/컬렉션 행이 하나 들어올 때마다 O(1)로 갱신한다.
+# 레벨은 닫힌 식, 티어는 TIER_MAP 이분 탐색.
+TIER_MAP = [
+    {"name": "Iron", "start": 1, "color": "#717171"},
+    {"name": "Bronze", "start": 13, "color": "#8C7853"},
+    {"name": "Silver", "start": 25, "color": "#808B96"},
+    {"name": "Gold", "start": 37, "color": "#D4AC0D"},
+    {"name": "Platinum", "start": 49, "color": "#27AE60"},
+    {"name": "Diamond", "start": 73, "color": "#2980B9"},
+    {"name": "Master", "start": 85, "color": "#8E44AD"},
+    {"name": "Challenger", "start": 109, "color": "#F1C40F"}
+]
+_TIER_STARTS = [t["start"] for t in TIER_MAP]
+
+
+def get_tier(lv):
+    i = bisect.bisect_right(_TIER_STARTS, lv) - 1
+    if i < 0: return "Iron", "#717171"
+    return TIER_MAP[i]["name"], TIER_MAP[i]["color"]
+
+
+# 레벨 L에 도달하는 누적 XP = 100 * (1 + 2 + ... + (L-1)) = 50 * L * (L-1)
+def level_from_xp(total_xp):
+    m = max(total_xp, 0) // 50
+    level = (1 + isqrt(1 + 4 * m)) // 2
+    return level, total_xp - 50 * level * (level - 1)
+
+
+def _prev_day(d):
+    return (date.fromisoformat(d) - timedelta(days=1)).isoformat()
+
+
+def _day_of(log):
+    day = str(log.get("Time", "")).split(" ")[0]
+    try: date.fromisoformat(day)
+    except ValueError: return None
+    return day
+
+
+class GameState:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.logs = []              # 반영한 로그 (시간순)
+        self.cols = []              # 반영한 컬렉션 행
+        self.total_xp = 0
+        self.used_gold = 0
+        self.pokemon_counts = {}
+        self.shinies = set()
+        self.claims = Counter()
+        self.daily_xp = {}          # "YYYY-MM-DD" -> XP
+        self.day_rows = Counter()   # "YYYY-MM-DD" -> 로그 수 (undo 용)
+        self.rollups = Rollups()    # 일/주/월 x 활동 종류 누적
+        self._last_day = None       # 기록이 있는 가장 최근 날짜
+        self._run = 0               # _last_day 에서 끝나는 연속 일수 (None = 다시 계산)
+
+    # ---------- 한 행씩 반영 ----------
+    def apply_log(self, log):
+        self.logs.append(log)
+        day = _day_of(log)
+        if day: self._add_day(day)
+        self._count(log, day, 1)
+
+    def remove_last_log(self):
+        log = self.logs.pop()
+        day = _day_of(log)
+        if day:
+            self.day_rows[day] -= 1
+            if self.day_rows[day] <= 0:
+                del self.day_rows[day]
+                self._run = None
+        self._count(log, day, -1)
+        if day in self.daily_xp and day not in self.day_rows: del self.daily_xp[day]
+
+    # 압축 체크포인트는 총 XP / 업적 / 월별 활동 누적을, 날짜별 요약 행은 일별 XP 만 들고 있다
+    def _count(self, log, day, sign):
+        act = str(log.get("Action", ""))
+        if act.startswith(CHECKPOINT_PREFIX):
+            cp = parse_checkpoint(act)
+            try: self.total_xp += sign * int(cp.get("xp", 0))
+            except (TypeError, ValueError): pass
+            self.rollups.add_months(cp.get("months", {}), sign)
+            for name in cp.get("sets", []): self.claims[name] += sign
+            return
+        try: xp = int(log.get("XP", 0))
+        except (TypeError, ValueError): return
+        if not act.startswith(SUMMARY_PREFIX): self.total_xp += sign * xp
+        if day:
+            self.daily_xp[day] = self.daily_xp.get(day, 0) + sign * xp
+            self.rollups.add(day, act, xp, log.get("Value", 0), sign)
+        if act.startswith(CLAIM_PREFIX): self.claims[act[len(CLAIM_PREFIX):]] += sign
+
+    def apply_collection(self, row):
+        self.cols.append(row)
+        try:
+            pid = int(row[0])
+            rarity = row[3]
+            cost = int(row[4])
+        except (TypeError, ValueError, IndexError): return
+        self.used_gold += cost
+        self.pokemon_counts[pid] = self.pokemon_counts.get(pid, 0) + 1
+        if "Shiny" in str(rarity): self.shinies.add(pid)
+
+    def _add_day(self, day):
+        self.day_rows[day] += 1
+        if self.day_rows[day] > 1 or self._run is None: return
+        if self._last_day is None or day > self._last_day:
+            if self._last_day is not None and _prev_day(day) == self._last_day: self._run += 1
+            else: self._run = 1
+            self._last_day = day
+        else:
+            self._run = None        # 과거 날짜가 늦게 들어옴 -> 필요할 때 다시 계산
+
+    # ---------- 저장소 스냅샷과 맞추기 ----------
+    # 이미 반영한 부분은 건너뛰고 새 행만 반영한다. 마지막 로그 하나가 빠졌으면 (undo)
+    # 그것만 되돌리고, 그 밖의 변화는 처음부터 다시 쌓는다.
+    def sync(self, logs, cols):
+        with self.lock:
+            n, m = len(self.logs), len(self.cols)
+            cols_ok = len(cols) >= m and (m == 0 or cols[m - 1] == self.cols[-1])
+            if cols_ok and len(logs) >= n and (n == 0 or logs[n - 1] == self.logs[-1]):
+                for log in logs[n:]: self.apply_log(log)
+            elif cols_ok and len(logs) == n - 1 and (n == 1 or logs[-1] == self.logs[-2]):
+                self.remove_last_log()
+            else:
+                self.reset()
+                for log in logs: self.apply_log(log)
+                m = 0
+            for row in cols[m:]: self.apply_collection(row)
+        return self
+
+    # ---------- 조회 ----------
+    @property
+    def level(self):
+        return level_from_xp(self.total_xp)[0]
+
+    @property
+    def current_xp(self):
+        return level_from_xp(self.total_xp)[1]
+
+    @property
+    def gold(self):
+        return self.total_xp - self.used_gold
+
+    @property
+    def claimed_sets(self):
+        return {name for name, c in self.claims.items() if c > 0}
+
+    @property
+    def tier(self):
+        return get_tier(self.level)
+
+    def streak(self, today):
+        # today: KST 기준 "YYYY-MM-DD". 오늘 기록이 없으면 어제부터 센다
+        with self.lock:
+            if not self.day_rows: return 0
+            if self._run is None:
+                self._last_day = max(self.day_rows)
+                self._run, d = 0, self._last_day
+                while d in self.day_rows:
+                    self._run += 1
+                    d = _prev_day(d)
+            if self._last_day == today or self._last_day == _prev_day(today): return self._run
+            return 0
@@ -0,0 +1,108 @@
+import json
+import os
+import requests
+from profiling import span
+
+# ==========================================
+# 1세대 도감 카탈로그 (오프라인)
+# ==========================================
+# pokedex_gen1.json 에 151마리의 타입/종족값 합계/희귀도/이름을 미리 담아 두고
+# 시작할 때 한 번만 읽는다. 뽑기는 더 이상 네트워크를 타지 않는다.
+# PokeAPI 로 다시 받은 항목은 디스크 캐시(.pokedex_cache.json)에 저장되어
+# 다음 실행부터 오프라인에서도 그 값이 쓰인다.
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pokedex_gen1.json")
+CACHE_PATH = ".pokedex_cache.json"
+POKEAPI_URL = "https://pokeapi.co/api/v2/pokemon/{pid}"
+ALL_IDS = range(1, 152)
+
+SPECIAL_IDS = {1, 4, 7, 25, 133, 143, 149, 150, 151}
+
+KOR_NAMES = {
+    1:"이상해씨", 2:"이상해풀", 3:"이상해꽃", 4:"파이리", 5:"리자드", 6:"리자몽",
+    7:"꼬부기", 8:"어니부기", 9:"거북왕", 10:"캐터피", 11:"단데기", 12:"버터플",
+    13:"뿔충이", 14:"딱충이", 15:"독침붕", 16:"구구", 17:"피죤", 18:"피죤투", 19:"꼬렛",
+    23:"아보", 24:"아보크", 25:"피카츄", 26:"라이츄", 29:"니드런♀", 31:"니드퀸", 32:"니드런♂", 34:"니드킹",
+    39:"푸린", 52:"나옹", 54:"고라파덕", 57:"성원숭", 59:"윈디", 65:"후딘", 68:"괴력몬", 74:"꼬마돌", 94:"팬텀", 95:"롱스톤",
+    97:"슬리퍼", 106:"시라소몬", 107:"홍수몬", 109:"또가스", 110:"또도가스", 122:"마임맨", 123:"스라이크", 127:"쁘사이저",
+    129:"잉어킹", 130:"갸라도스", 131:"라프라스", 133:"이브이", 134:"샤미드", 135:"쥬피썬더", 136:"부스터",
+    139:"암스타", 141:"투구푸스", 142:"프테라",
+    143:"잠만보", 144:"프리져", 145:"썬더", 146:"파이어",
+    149:"망나뇽", 150:"뮤츠", 151:"뮤"
+}
+
+
+def derive_rarity(pid, stats):
+    rarity = "Normal"
+    if stats >= 580: rarity = "Legend"
+    elif stats >= 500: rarity = "Rare"
+    if pid in SPECIAL_IDS: rarity = "Special"
+    return rarity
+
+
+def make_entry(pid, name, p_type, stats):
+    return {
+        "id": pid,
+        "name": name,
+        "kor_name": KOR_NAMES.get(pid, name.capitalize()),
+        "type": p_type,
+        "stats": stats,
+        "rarity": derive_rarity(pid, stats),
+    }
+
+
+def _read(path):
+    try:
+        with open(path, encoding="utf-8") as f: data = json.load(f)
+    except (OSError, ValueError): return {}
+    return {int(e["id"]): e for e in data}
+
+
+def _write(path, catalog):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write("[\n" + ",\n".join(json.dumps(catalog[pid], ensure_ascii=False) for pid in sorted(catalog)) + "\n]\n")
+    os.replace(tmp, path)
+
+
+def load_catalog(cache_path=CACHE_PATH):
+    catalog = _read(CATALOG_PATH)
+    catalog.update(_read(cache_path))
+    return catalog
+
+
+def fetch_entry(pid, timeout=5):
+    with span("pokeapi", "http"): res = requests.get(POKEAPI_URL.format(pid=pid), timeout=timeout)
+    res.raise_for_status()
+    res = res.json()
+    stats = sum(s["base_stat"] for s in res["stats"])
+    return make_entry(pid, res["name"], res["types"][0]["type"]["name"], stats)
+
+
+# 온라인일 때 PokeAPI 에서 다시 받아 디스크 캐시에 저장. 받은 개수를 돌려준다
+def refresh_catalog(pids=ALL_IDS, cache_path=CACHE_PATH):
+    cached = _read(cache_path)
+    done = 0
+    for pid in pids:
+        try: cached[pid] = fetch_entry(pid)
+        except (requests.RequestException, KeyError, ValueError): continue
+        done += 1
+    if done: _write(cache_path, cached)
+    return done
+
+
+def get_poke_info(catalog, pid):
+    e = catalog.get(pid)
+    if e is None: return "Unknown", "Normal", "normal"
+    return e["kor_name"], e["rarity"], e["type"]
+
+
+if __name__ == "__main__":
+    # python pokedex.py          -> 디스크 캐시 갱신
+    # python pokedex.py --build  -> 번들 카탈로그(pokedex_gen1.json) 재생성
+    import sys
+    if "--build" in sys.argv:
+        catalog = {pid: fetch_entry(pid) for pid in ALL_IDS}
+        _write(CATALOG_PATH, catalog)
+        print(f"{len(catalog)}개 항목을 {CATALOG_PATH} 에 저장")
+    else:
+        print(f"{refresh_catalog()}개 항목 갱신 -> {CACHE_PATH}")
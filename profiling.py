@@ -0,0 +1,144 @@
+import json
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+
+# ==========================================
+# rerun 단위 타이밍
+# ==========================================
+# span(name, kind) 으로 감싼 구간의 시간을 지금 rerun 의 Trace 에 쌓는다.
+# kind: "sheets" (gspread 호출) / "http" / "aggregate" / "render" / "code"
+# rerun 이 끝나면 Trace 를 JSON 한 줄로 파일에 남긴다 (나중에 세션 단위로 분석).
+# 스크립트 스레드가 아닌 곳 (쓰기 저널 flush 등) 의 span 은 background 로 모았다가 같이 쓴다.
+LOG_PATH = os.environ.get("GWANHEE_TIMING_LOG", ".gwanhee_timing.jsonl")
+LOG_MAX_BYTES = 10 * 1024 * 1024
+
+_local = threading.local()
+_background = []
+_bg_lock = threading.Lock()
+_file_lock = threading.Lock()
+
+
+class Trace:
+    def __init__(self, session="", **meta):
+        self.id = uuid.uuid4().hex[:12]
+        self.session = session
+        self.meta = meta
+        self.started = time.time()
+        self.t0 = time.perf_counter()
+        self.spans = []         # [(kind, name, ms)]
+        self.total_ms = None
+
+    def add(self, kind, name, ms):
+        self.spans.append((kind, name, ms))
+
+    # (kind, name) 별 횟수 / 합계 ms, 오래 걸린 순
+    def summary(self):
+        agg = defaultdict(lambda: [0, 0.0])
+        for kind, name, ms in self.spans:
+            agg[(kind, name)][0] += 1
+            agg[(kind, name)][1] += ms
+        return sorted(((k, n, c, round(ms, 2)) for (k, n), (c, ms) in agg.items()), key=lambda r: -r[3])
+
+    def by_kind(self):
+        agg = defaultdict(lambda: [0, 0.0])
+        for kind, _, ms in self.spans:
+            agg[kind][0] += 1
+            agg[kind][1] += ms
+        return {k: {"count": c, "ms": round(ms, 2)} for k, (c, ms) in agg.items()}
+
+    def finish(self, **extra):
+        if self.total_ms is None:
+            self.total_ms = (time.perf_counter() - self.t0) * 1000
+            self.meta.update(extra)
+        return self
+
+    def to_json(self):
+        return {"type": "rerun", "id": self.id, "session": self.session, "ts": round(self.started, 3),
+                "total_ms": round(self.total_ms or 0, 2), **self.meta, "kinds": self.by_kind(),
+                "spans": [{"kind": k, "name": n, "count": c, "ms": ms} for k, n, c, ms in self.summary()]}
+
+
+def current():
+    return getattr(_local, "trace", None)
+
+
+def begin(session="", **meta):
+    _local.trace = Trace(session, **meta)
+    return _local.trace
+
+
+@contextmanager
+def span(name, kind="code"):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        ms = (time.perf_counter() - t0) * 1000
+        trace = current()
+        if trace is not None and trace.total_ms is None: trace.add(kind, name, ms)
+        else:
+            with _bg_lock: _background.append((kind, name, ms, time.time()))
+
+
+def end(trace, path=LOG_PATH, **extra):
+    trace.finish(**extra)
+    if getattr(_local, "trace", None) is trace: _local.trace = None
+    if not path: return trace
+    lines = [trace.to_json()]
+    with _bg_lock:
+        bg, _background[:] = list(_background), []
+    if bg:
+        lines.append({"type": "background", "ts": round(time.time(), 3),
+                      "spans": [{"kind": k, "name": n, "ms": round(ms, 2), "at": round(at, 3)} for k, n, ms, at in bg]})
+    with _file_lock:
+        try:
+            if os.path.exists(path) and os.path.getsize(path) > LOG_MAX_BYTES: os.replace(path, path + ".1")
+            with open(path, "a", encoding="utf-8") as f:
+                for line in lines: f.write(json.dumps(line, ensure_ascii=False) + "\n")
+        except OSError:
+            pass    # 타이밍 기록 실패가 앱을 멈추면 안 된다
+    return trace
+
+
+# ==========================================
+# gspread 객체 감싸기
+# ==========================================
+# 메서드 호출마다 sheets.<메서드> span 을 남긴다. Worksheet/Spreadsheet 를 돌려주면 (속성도) 그것도 감싼다.
+_WRAP_TYPES = {"Client", "Spreadsheet", "Worksheet"}
+
+
+# gspread 객체 또는 그것을 감싼 다른 프록시 (sheets_client.QuotaClient)
+def _wrappable(obj):
+    return type(obj).__name__ in _WRAP_TYPES or getattr(type(obj), "_gspread_proxy", False)
+
+
+class TracedProxy:
+    def __init__(self, obj, kind="sheets"):
+        object.__setattr__(self, "_obj", obj)
+        object.__setattr__(self, "_kind", kind)
+
+    def __getattr__(self, attr):
+        value = getattr(self._obj, attr)
+        if attr.startswith("_"): return value
+        if _wrappable(value): return TracedProxy(value, self._kind)
+        if not callable(value): return value
+        kind = self._kind
+
+        def call(*args, **kwargs):
+            with span(f"{kind}.{attr}", kind):
+                res = value(*args, **kwargs)
+            if _wrappable(res): return TracedProxy(res, kind)
+            if isinstance(res, list) and res and _wrappable(res[0]):
+                return [TracedProxy(r, kind) for r in res]
+            return res
+        return call
+
+    def __setattr__(self, attr, value):
+        setattr(self._obj, attr, value)
+
+    def __repr__(self):
+        return f"TracedProxy({self._obj!r})"
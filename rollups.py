@@ -0,0 +1,87 @@
+from datetime import date, timedelta
+from functools import lru_cache
+from compaction import CHECKPOINT_PREFIX, COMPACTED_KIND, action_kind, summary_count
+
+# ==========================================
+# 기간별 / 활동별 누적 (장기 분석용)
+# ==========================================
+# 로그가 하나 들어올 때마다 일 / 주 / 월 버킷의 (활동 종류)별 [XP, 횟수, 수치] 를 갱신한다.
+# 표 크기는 로그 수가 아니라 날짜 수 x 활동 종류 수에 비례하므로
+# 기록이 몇 년 치가 되어도 차트는 이 표만 읽는다.
+#   주 = 그 주 월요일 "YYYY-MM-DD", 월 = "YYYY-MM"
+# 압축된 날은 [일일 요약] 행이 일/주 표에 COMPACTED_KIND 로 들어가고,
+# 월 표의 활동별 값은 체크포인트의 months 로 채운다 (add_months).
+PERIODS = ("day", "week", "month")
+PERIOD_LABELS = {"day": "일", "week": "주", "month": "월"}
+
+
+@lru_cache(maxsize=4096)
+def period_keys(day):
+    d = date.fromisoformat(day)
+    return day, (d - timedelta(days=d.weekday())).isoformat(), day[:7]
+
+
+# 같은 라벨 ("🏃 달리기 5.0km") 이 반복되므로 파싱 결과를 기억해 둔다
+@lru_cache(maxsize=4096)
+def _kind_count(act):
+    return action_kind(act), summary_count(act)
+
+
+def _num(v):
+    try: return float(v)
+    except (TypeError, ValueError): return 0.0
+
+
+class Rollups:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.tables = {p: {} for p in PERIODS}     # period -> {key: {kind: [xp, n, value]}}
+
+    # sign=-1 이면 되돌린다 (undo)
+    def add(self, day, act, xp, value, sign=1):
+        act = str(act)
+        if act.startswith(CHECKPOINT_PREFIX): return
+        (kind, n), value = _kind_count(act), _num(value)
+        # 날짜별 요약 행 (COMPACTED_KIND) 은 일/주에만. 그 달 값은 체크포인트에 활동별로 있다
+        periods = PERIODS[:2] if kind == COMPACTED_KIND else PERIODS
+        for period, key in zip(periods, period_keys(day)):
+            self._bump(period, key, kind, xp, n, value, sign)
+
+    # 체크포인트의 {"YYYY-MM": {kind: [xp, n, value]}}
+    def add_months(self, months, sign=1):
+        for key, kinds in months.items():
+            for kind, (xp, n, value) in kinds.items(): self._bump("month", key, kind, xp, n, _num(value), sign)
+
+    def _bump(self, period, key, kind, xp, n, value, sign):
+        bucket = self.tables[period].setdefault(key, {})
+        b = bucket.setdefault(kind, [0, 0, 0.0])
+        b[0] += sign * xp
+        b[1] += sign * n
+        b[2] += sign * value
+        if b[1] <= 0:
+            del bucket[kind]
+            if not bucket: del self.tables[period][key]
+
+    # since: 이 날짜가 속한 버킷부터. 열 리스트로 돌려준다 (DataFrame 에 그대로 넣는다)
+    def columns(self, period, since=None):
+        start = period_keys(since)[PERIODS.index(period)] if since else ""
+        cols = {"Period": [], "Activity": [], "XP": [], "Count": [], "Value": []}
+        for key, bucket in self.tables[period].items():
+            if key < start: continue
+            for kind, (xp, n, value) in bucket.items():
+                cols["Period"].append(key); cols["Activity"].append(kind)
+                cols["XP"].append(xp); cols["Count"].append(n); cols["Value"].append(round(value, 2))
+        return cols
+
+
+# 선택한 기간의 (버킷 x 활동) XP 표와 활동별 합계 (pandas 로 한 번에 계산)
+def growth_frames(rollups, period, since=None):
+    import pandas as pd
+    df = pd.DataFrame(rollups.columns(period, since))
+    if df.empty: return df, df
+    pivot = df.pivot_table(index="Period", columns="Activity", values="XP", aggfunc="sum", fill_value=0).sort_index()
+    totals = df.groupby("Activity")[["XP", "Count", "Value"]].sum().sort_values("XP", ascending=False)
+    totals["Share"] = (totals["XP"] / max(totals["XP"].sum(), 1) * 100).round(1)
+    return pivot, totals
@@ -0,0 +1,150 @@
+import threading
+import time
+
+# ==========================================
+# 워크시트 증분 동기화
+# ==========================================
+# 매 rerun마다 전체 시트를 다시 받지 않고, 이미 본 행 수를 기억해 두었다가
+# "마지막으로 본 행 ~ 끝" 범위만 한 번 읽는다.
+#  - 첫 행이 캐시의 마지막 행과 같으면 나머지는 새로 추가된 행
+#  - 다르거나 비어 있으면 (undo 등으로 삭제/변경됨) 전체를 다시 읽는다
+# max_age 안에 다시 부르면 네트워크를 타지 않는다. 여러 세션이 같은 스냅샷을
+# 공유할 때 읽기가 세션 수만큼 늘지 않게 하려는 것. 이 프로세스가 시트 끝에 붙인 행은
+# push() 로 스냅샷에 바로 넣고 (다시 읽지 않는다), 무엇이 들어갔는지 모를 때만
+# mark_stale() 로 다음 읽기에서 꼭 확인하게 한다.
+# 읽기는 plan() -> fetch() (네트워크, lock 없음) -> apply() 셋으로 나뉜다. 부르는 쪽이
+# 자기 lock 을 네트워크 동안 잡고 있지 않게. 그 사이 스냅샷이 바뀌었으면 (gen) 읽은 것은 버린다.
+
+
+def numericise(value):
+    # gspread의 get_all_records()와 같은 규칙으로 숫자 문자열을 변환
+    if isinstance(value, str):
+        s = value.replace(",", "")
+        if s == "": return value
+        try: return int(s)
+        except ValueError: pass
+        try: return float(s)
+        except ValueError: return value
+    return value
+
+
+# push() 한 행은 시트가 표시하는 형태와 다를 수 있다 (5.0 -> "5"). 값으로 비교
+def _same(a, b):
+    return [numericise(v) for v in a] == [numericise(v) for v in b]
+
+
+class SheetSync:
+    def __init__(self, ws, last_col, max_age=0):
+        self.ws = ws
+        self.last_col = last_col
+        self.max_age = max_age
+        self.fetched_at = 0.0
+        self.stale = False
+        self.width = ord(last_col.upper()) - ord("A") + 1
+        self.header = []
+        self.rows = []      # 헤더를 제외한 원본 행 (문자열, width 길이로 패딩)
+        self.records = []   # rows를 헤더 키로 변환한 dict (get_all_records 형태)
+        self.loaded = False
+        self.gen = 0        # 스냅샷이 바뀔 때마다 +1
+        self.lock = threading.Lock()
+
+    def _pad(self, row):
+        row = [str(v) for v in row][:self.width]
+        return row + [""] * (self.width - len(row))
+
+    def _to_record(self, row):
+        return {k: numericise(v) for k, v in zip(self.header, row) if k}
+
+    # 아직 시트에 없는 행(쓰기 저널 등)을 스냅샷과 같은 형태로 변환
+    def preview(self, raw_rows):
+        rows = [self._pad(r) for r in raw_rows]
+        return rows, [self._to_record(r) for r in rows]
+
+    def _append(self, raw_rows):
+        self.gen += 1
+        for raw in raw_rows:
+            row = self._pad(raw)
+            self.rows.append(row)
+            self.records.append(self._to_record(row))
+
+    # 다른 경로 (시작 시 values_batch_get 등) 로 받은 전체 값을 스냅샷으로 삼는다
+    def seed(self, values):
+        with self.lock: self._load_values(values)
+
+    def _load_values(self, values):
+        self.header = self._pad(values[0]) if values else []
+        self.rows, self.records = [], []
+        self._append(values[1:])
+        self.loaded = True
+        self.fetched_at = time.monotonic()
+        self.stale = False
+
+    # 다시 읽을 때가 됐는지 (못 받았거나, 확인이 필요하거나, max_age 가 지났거나)
+    def due(self):
+        return not self.loaded or self.stale or time.monotonic() - self.fetched_at >= self.max_age
+
+    # 지금 스냅샷에서 무엇을 읽을지 -> (gen, loaded, 시작 행 번호, 마지막으로 본 행)
+    def plan(self):
+        with self.lock:
+            last_seen = self.rows[-1] if self.rows else self.header
+            return self.gen, self.loaded, len(self.rows) + 1, last_seen   # 시트 행 번호 (헤더가 1행)
+
+    def fetch(self, plan):
+        _, loaded, start, last_seen = plan
+        if loaded:
+            got = self.ws.get(f"A{start}:{self.last_col}")
+            if got and _same(self._pad(got[0]), last_seen): return "tail", got[1:]
+        return "full", self.ws.get_all_values()
+
+    # plan 이후 스냅샷이 바뀌었으면 (push / drop_last / 다른 읽기) 버리고 False
+    def apply(self, plan, fetched):
+        kind, values = fetched
+        with self.lock:
+            if plan[0] != self.gen: return False
+            if kind == "full":
+                self._load_values(values)
+                return True
+            self._append(values)
+            self.fetched_at = time.monotonic()
+            self.stale = False
+            return True
+
+    # 혼자 읽을 때. 다른 쪽과 겹쳐 버려졌으면 몇 번 다시
+    def refresh(self, tries=3):
+        for _ in range(tries):
+            if not self.due(): return
+            plan = self.plan()
+            if self.apply(plan, self.fetch(plan)): return
+
+    # 방금 시트 끝에 붙인 행. 그 사이 다른 곳에서 붙인 행이 있으면
+    # 다음 refresh 의 첫 행 비교가 어긋나 전체를 다시 읽는다
+    def push(self, raw_rows):
+        with self.lock:
+            if self.loaded: self._append(raw_rows)
+
+    def mark_stale(self):
+        with self.lock:
+            self.stale = True
+            self.gen += 1
+
+    def invalidate(self):
+        with self.lock:
+            self.loaded = False
+            self.gen += 1
+
+    # 스냅샷의 마지막 행이 row 인지
+    def last_is(self, row):
+        with self.lock:
+            return bool(self.rows) and _same(self.rows[-1], self._pad(row))
+
+    # 시트에 마지막으로 있는 행 번호 (헤더 포함)
+    def row_count(self):
+        return len(self.rows) + 1
+
+    # 시트에서 마지막 행을 지운 뒤 로컬 스냅샷도 맞춰 준다
+    def drop_last(self):
+        with self.lock:
+            if self.rows:
+                self.rows.pop()
+                self.records.pop()
+                self.gen += 1
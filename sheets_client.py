@@ -0,0 +1,167 @@
+import copy
+import random
+import threading
+import time
+from collections import Counter, deque
+import requests
+
+# ==========================================
+# 할당량을 아는 gspread 래퍼
+# ==========================================
+# Sheets API 는 사용자(서비스 계정)당 분당 읽기 60 / 쓰기 60 회가 기본 한도다.
+#   - 토큰 버킷: 읽기/쓰기 따로, 한도보다 조금 낮게 (넘으면 429 가 오기 전에 기다린다)
+#   - 같은 읽기 합치기: 같은 객체에 같은 인자로 window 초 안에 다시 읽으면 API 를 타지 않는다.
+#     진행 중인 같은 읽기가 있으면 그 결과를 같이 받는다. 쓰기가 하나라도 나가면 비운다.
+#   - 재시도: 읽기는 429 / 5xx / 네트워크 오류, 쓰기는 429 만 (5xx 는 실제로 들어갔을 수 있어서
+#     쓰기 저널이 시트 끝을 확인하고 다시 보낸다). 지수 백오프 + 지터.
+# Client / Spreadsheet / Worksheet 를 돌려주는 메서드와 속성 (ws.spreadsheet 등) 은 그 결과도 감싼다.
+READ_METHODS = {"get", "get_all_values", "get_all_records", "get_values", "batch_get", "values_batch_get",
+                "row_values", "col_values", "acell", "cell", "worksheet", "worksheets", "open", "open_by_key",
+                "fetch_sheet_metadata"}
+_WRAP_TYPES = {"Client", "Spreadsheet", "Worksheet"}
+
+
+def status_code(e):
+    return getattr(getattr(e, "response", None), "status_code", None)
+
+
+# 합친 읽기 결과는 호출한 쪽이 고쳐도 서로 영향이 없게 (gspread 객체는 그대로 나눠 쓴다)
+def _copy(res):
+    if isinstance(res, dict): return copy.deepcopy(res)
+    if isinstance(res, list): return [list(r) if isinstance(r, list) else dict(r) if isinstance(r, dict) else r for r in res]
+    return res
+
+
+def _retryable(e, write):
+    code = status_code(e)
+    if code == 429: return True
+    if write: return False
+    if code is not None: return code >= 500
+    return isinstance(e, (requests.ConnectionError, requests.Timeout))
+
+
+class TokenBucket:
+    def __init__(self, per_minute, burst=10):
+        self.rate = per_minute / 60.0
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.at = time.monotonic()
+        self.lock = threading.Lock()
+
+    # 토큰 하나를 쓴다. 기다린 시간(초)을 돌려준다
+    def take(self):
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.at) * self.rate)
+                self.at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                need = (1 - self.tokens) / self.rate
+            time.sleep(need)
+            waited += need
+
+
+class Quota:
+    def __init__(self, reads_per_min=55, writes_per_min=55, window=1.0, retries=5, backoff=1.0, max_backoff=32.0):
+        self.buckets = {"read": TokenBucket(reads_per_min), "write": TokenBucket(writes_per_min)}
+        self.window = window
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.lock = threading.Lock()
+        self.cache = {}             # key -> (시각, 결과)
+        self.inflight = {}          # key -> Event (진행 중인 같은 읽기)
+        self.recent = {"read": deque(), "write": deque()}   # 최근 60초 호출 시각
+        self.counts = Counter()     # calls.read / calls.write / coalesced / retries / errors.429 ...
+        self.waited = 0.0           # 토큰 버킷에서 기다린 총 시간
+
+    def _record(self, kind):
+        now = time.monotonic()
+        with self.lock:
+            self.counts[f"calls.{kind}"] += 1
+            q = self.recent[kind]
+            q.append(now)
+            while q and now - q[0] > 60: q.popleft()
+
+    def stats(self):
+        now = time.monotonic()
+        with self.lock:
+            out = dict(self.counts)
+            for kind, q in self.recent.items():
+                out[f"{kind}/min"] = sum(1 for t in q if now - t <= 60)
+            out["throttled_s"] = round(self.waited, 2)
+        return out
+
+    def call(self, key, fn, args, kwargs, write):
+        if write:
+            with self.lock: self.cache.clear()
+            return self._send(fn, args, kwargs, "write")
+        while True:
+            with self.lock:
+                hit = self.cache.get(key)
+                if hit and time.monotonic() - hit[0] < self.window:
+                    self.counts["coalesced"] += 1
+                    return _copy(hit[1])
+                ev = self.inflight.get(key)
+                if ev is None:
+                    ev = self.inflight[key] = threading.Event()
+                    break
+            ev.wait()   # 같은 읽기가 끝나면 그 결과를 캐시에서 받는다 (실패했으면 직접 읽는다)
+        try:
+            res = self._send(fn, args, kwargs, "read")
+            with self.lock:
+                now = time.monotonic()
+                for k in [k for k, (at, _) in self.cache.items() if now - at >= self.window]: del self.cache[k]
+                self.cache[key] = (now, res)
+            return res
+        finally:
+            with self.lock: self.inflight.pop(key, None)
+            ev.set()
+
+    def _send(self, fn, args, kwargs, kind):
+        for attempt in range(self.retries + 1):
+            waited = self.buckets[kind].take()
+            if waited:
+                with self.lock: self.waited += waited
+            self._record(kind)
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                code = status_code(e)
+                with self.lock: self.counts[f"errors.{code or type(e).__name__}"] += 1
+                if attempt == self.retries or not _retryable(e, kind == "write"): raise
+                with self.lock: self.counts["retries"] += 1
+                time.sleep(random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt)))
+
+
+class QuotaClient:
+    _gspread_proxy = True
+
+    def __init__(self, obj, quota=None):
+        object.__setattr__(self, "_obj", obj)
+        object.__setattr__(self, "quota", quota or Quota())
+
+    def __getattr__(self, attr):
+        value = getattr(self._obj, attr)
+        if attr.startswith("_"): return value
+        if type(value).__name__ in _WRAP_TYPES: return QuotaClient(value, self.quota)
+        if not callable(value): return value
+        quota, obj = self.quota, self._obj
+
+        def call(*args, **kwargs):
+            key = (id(obj), attr, repr(args), repr(sorted(kwargs.items())))
+            res = quota.call(key, value, args, kwargs, write=attr not in READ_METHODS)
+            if type(res).__name__ in _WRAP_TYPES: return QuotaClient(res, quota)
+            if isinstance(res, list) and res and type(res[0]).__name__ in _WRAP_TYPES:
+                return [QuotaClient(r, quota) for r in res]
+            return res
+        return call
+
+    def __setattr__(self, attr, value):
+        setattr(self._obj, attr, value)
+
+    def __repr__(self):
+        return f"QuotaClient({self._obj!r})"
@@ -0,0 +1,70 @@
+import json
+import os
+import threading
+import time
+
+# ==========================================
+# 로컬 스냅샷 (첫 화면용)
+# ==========================================
+# 컨테이너가 새로 뜨면 시트 연결 + 첫 읽기에 몇 초가 걸린다. 그동안 마지막으로 본
+# 로그/컬렉션을 파일에서 읽어 먼저 그리고, 실제 데이터는 백그라운드에서 받는다.
+# 저장은 every 초에 한 번, 행 수가 바뀌었을 때만 (백그라운드 스레드, 원자적 교체).
+SNAPSHOT_PATH = ".gwanhee_snapshot.json"
+
+
+class Snapshot:
+    def __init__(self, path=SNAPSHOT_PATH, every=60.0):
+        self.path = path
+        self.every = every
+        self.saved_at = 0.0
+        self.saved_size = None
+        self.lock = threading.Lock()
+
+    def load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f: data = json.load(f)
+            return data["logs"], data["cols"], data.get("ts", 0)
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def save(self, logs, cols):
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"ts": time.time(), "logs": logs, "cols": cols}, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp, self.path)
+        except OSError:
+            pass    # 스냅샷은 없어도 된다 (다음 시작이 조금 느릴 뿐)
+
+    # 저장할 때만 복사한다 (호출하는 쪽은 logs / cols 를 바꾸는 lock 을 잡고 부를 것)
+    def maybe_save(self, logs, cols):
+        size = (len(logs), len(cols), logs[-1] if logs else None)
+        with self.lock:
+            if size == self.saved_size: return False
+            if self.saved_at and time.monotonic() - self.saved_at < self.every: return False
+            self.saved_at, self.saved_size = time.monotonic(), size
+        threading.Thread(target=self.save, args=(list(logs), list(cols)), daemon=True).start()
+        return True
+
+
+# 시간이 걸리는 준비 작업 (시트 연결) 을 백그라운드에서 한 번 돌려 둔다
+class Loader:
+    def __init__(self, fn):
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+        threading.Thread(target=self._run, args=(fn,), daemon=True).start()
+
+    def _run(self, fn):
+        try: self.result = fn()
+        except BaseException as e: self.error = e     # st.stop() 도 여기로
+        finally: self.done.set()
+
+    def ready(self):
+        return self.done.is_set()
+
+    def wait(self, timeout=None):
+        self.done.wait(timeout)
+        if isinstance(self.error, Exception): raise self.error
+        if self.error is not None: raise RuntimeError(f"준비 중단: {self.error!r}")
+        return self.result
@@ -0,0 +1,127 @@
+import base64
+import io
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from PIL import Image
+from profiling import span
+
+# ==========================================
+# 로컬 스프라이트 저장소
+# ==========================================
+# 일반/이로치 스프라이트를 한 번만 받아 디스크에 두고, 실루엣(검정 20%)은
+# 받을 때 미리 만들어 둔다. 화면에는 data-URI 로 인라인해서 브라우저가
+# 외부 이미지를 하나도 요청하지 않게 한다.
+SPRITE_URL = "https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon/{prefix}{pid}.png"
+SPRITE_DIR = ".sprite_cache"
+ALL_IDS = range(1, 152)
+SHADOW_ALPHA = 0.2
+RETRY_AFTER = 60        # 백그라운드로 받다 실패 (오프라인 등) 하면 이만큼 뒤에 다시
+
+# 받지 못한 스프라이트 자리 (투명 1x1 PNG)
+BLANK_URI = "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAAC0lEQVR42mNgAAIAAAUAAen63NgAAAAASUVORK5CYII="
+
+
+def make_shadow(png_bytes):
+    img = Image.open(io.BytesIO(png_bytes)).convert("RGBA")
+    alpha = img.getchannel("A").point(lambda a: int(a * SHADOW_ALPHA))
+    shadow = Image.new("RGBA", img.size, (0, 0, 0, 0))
+    shadow.putalpha(alpha)
+    out = io.BytesIO()
+    shadow.save(out, format="PNG", optimize=True)
+    return out.getvalue()
+
+
+class SpriteStore:
+    def __init__(self, root=SPRITE_DIR, timeout=5):
+        self.root = root
+        self.timeout = timeout
+        self.cache = {}     # (kind, pid) -> data-URI
+        self.fetching = False           # 백그라운드 prefetch 는 한 번에 하나
+        self.fetched_at = float("-inf") # 마지막 백그라운드 prefetch 시작 시각
+        self.lock = threading.Lock()
+        for kind in ("normal", "shiny", "shadow"):
+            os.makedirs(os.path.join(root, kind), exist_ok=True)
+
+    def path(self, kind, pid):
+        return os.path.join(self.root, kind, f"{pid}.png")
+
+    # 다른 프로세스 (python sprites.py, 다른 앱) 가 같은 pid 를 동시에 받을 수 있어 임시 파일은 매번 새 이름
+    def _save(self, kind, pid, data):
+        fd, tmp = tempfile.mkstemp(suffix=".tmp", dir=os.path.join(self.root, kind))
+        try:
+            with os.fdopen(fd, "wb") as f: f.write(data)
+            os.replace(tmp, self.path(kind, pid))
+        except OSError:
+            try: os.remove(tmp)
+            except OSError: pass
+            raise
+
+    def _download(self, kind, pid):
+        prefix = "shiny/" if kind == "shiny" else ""
+        with span("sprite", "http"): res = requests.get(SPRITE_URL.format(prefix=prefix, pid=pid), timeout=self.timeout)
+        res.raise_for_status()
+        return res.content
+
+    # 없는 것만 받는다. 실패(오프라인 등)하면 False
+    def fetch(self, pid):
+        try:
+            for kind in ("normal", "shiny"):
+                if not os.path.exists(self.path(kind, pid)):
+                    self._save(kind, pid, self._download(kind, pid))
+            if not os.path.exists(self.path("shadow", pid)):
+                with open(self.path("normal", pid), "rb") as f:
+                    self._save("shadow", pid, make_shadow(f.read()))
+        except (requests.RequestException, OSError):
+            return False
+        return True
+
+    def missing(self, pids=ALL_IDS):
+        return [pid for pid in pids
+                if not all(os.path.exists(self.path(k, pid)) for k in ("normal", "shiny", "shadow"))]
+
+    def prefetch(self, pids=ALL_IDS, workers=8):
+        todo = self.missing(pids)
+        if not todo: return 0
+        with ThreadPoolExecutor(workers) as ex:
+            return sum(ex.map(self.fetch, todo))
+
+    # 이미 받는 중이거나 RETRY_AFTER 안에 시도했으면 넘어간다
+    def prefetch_async(self, pids=ALL_IDS):
+        with self.lock:
+            if self.fetching or time.monotonic() - self.fetched_at < RETRY_AFTER: return
+            self.fetching, self.fetched_at = True, time.monotonic()
+        threading.Thread(target=self._prefetch_bg, args=(pids,), daemon=True).start()
+
+    def _prefetch_bg(self, pids):
+        try: self.prefetch(pids)
+        finally:
+            with self.lock: self.fetching = False
+
+    def uri(self, kind, pid):
+        key = (kind, pid)
+        if key in self.cache: return self.cache[key]
+        try:
+            with open(self.path(kind, pid), "rb") as f: data = f.read()
+        except OSError:
+            return BLANK_URI    # 다음 rerun 에 다시 시도
+        uri = "data:image/png;base64," + base64.b64encode(data).decode("ascii")
+        with self.lock: self.cache[key] = uri
+        return uri
+
+    # 한 화면에 필요한 것들을 한 번에. keys = [(kind, pid), ...]
+    # 화면을 그리는 중에는 네트워크를 타지 않는다. 아직 없는 것은 빈 이미지로 두고
+    # 백그라운드에서 받는다 (다음 rerun 에 보인다)
+    def uris(self, keys):
+        out = [self.uri(kind, pid) for kind, pid in keys]
+        missing = sorted({pid for (kind, pid), uri in zip(keys, out) if uri == BLANK_URI})
+        if missing: self.prefetch_async(missing)
+        return out
+
+if __name__ == "__main__":
+    # python sprites.py -> 151마리 스프라이트/실루엣을 미리 받아 둔다 (오프라인 준비)
+    store = SpriteStore()
+    print(f"{store.prefetch()}마리 저장, 남은 것 {len(store.missing())}마리 -> {SPRITE_DIR}")
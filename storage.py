@@ -0,0 +1,370 @@
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from sheet_sync import SheetSync
+from write_queue import WriteJournal
+from compaction import batch_id, compact
+
+# ==========================================
+# 저장소 추상화
+# ==========================================
+# 앱이 실제로 쓰는 연산만 모았다.
+#   - read_all(): (로그 records, 컬렉션 rows) — 로그는 get_all_records() 형태의 dict,
+#                 컬렉션은 헤더를 뺀 [ID, Name, Date, Rarity, Cost, Type] 리스트
+#                 refresh=False 면 원격을 다시 읽지 않고 가진 것 + 방금 쓴 것만 (액션 직후).
+#                 그래도 아직 못 받았거나 확인이 필요한 시트는 읽는다
+#   - loaded(): read_all(refresh=False) 가 원격을 읽지 않고 답할 수 있는지 (받아 둔 스냅샷이 있는지)
+#   - take_failures(): 저장에 실패해서 버린 쓰기 (화면에서 되돌렸다고 알려 줄 것)
+#   - backlog(): (아직 못 보낸 쓰기 수, 마지막 오류) — 재시도 중이면 화면에 알린다
+#   - append_logs / append_collection / delete_last_log / set_status
+#   - compact_logs(cutoff_day): cutoff 이전 로그를 요약+체크포인트로 바꾸고 원본은 아카이브로
+LOG_HEADER = ["Time", "Action", "XP", "Value"]
+COL_HEADER = ["ID", "Name", "Date", "Rarity", "Cost", "Type"]
+ARCHIVE_SHEET = "Logs_Archive"
+ARCHIVE_HEADER = LOG_HEADER + ["Batch"]     # 시트 아카이브는 행마다 압축 묶음 id 를 붙인다
+
+
+class Storage:
+    def read_all(self, refresh=True):
+        raise NotImplementedError
+
+    def loaded(self):
+        return True
+
+    def append_logs(self, rows):
+        raise NotImplementedError
+
+    def append_log(self, row):
+        self.append_logs([row])
+
+    def append_collection(self, rows):
+        raise NotImplementedError
+
+    def delete_last_log(self):
+        raise NotImplementedError
+
+    def set_status(self, level):
+        pass
+
+    def take_failures(self):
+        return []
+
+    def backlog(self):
+        return 0, None
+
+    def compact_logs(self, cutoff_day):
+        raise NotImplementedError
+
+
+# ==========================================
+# Google Sheets (증분 동기화 + 쓰기 저널)
+# ==========================================
+# 트레이너별 워크시트 (Logs_민수 등) 를 넘겨받는다. max_age 는 SheetSync 참고.
+# initial = {"Logs": 값, "Collection": 값} 을 주면 (open_sheets) 첫 읽기를 건너뛴다.
+class SheetsStorage(Storage):
+    def __init__(self, ws_status, ws_logs, ws_col, journal_path, max_age=0, initial=None):
+        self.ws_logs = ws_logs
+        self.logs_sync = SheetSync(ws_logs, "D", max_age)
+        self.col_sync = SheetSync(ws_col, "F", max_age)
+        if initial:
+            self.logs_sync.seed(initial["Logs"])
+            self.col_sync.seed(initial["Collection"])
+        self.syncs = {"Logs": self.logs_sync, "Collection": self.col_sync}
+        self.journal = WriteJournal(journal_path, {"Status": ws_status, "Logs": ws_logs, "Collection": ws_col},
+                                    on_flush=self._on_flush, remove_last=self._remove_last)
+
+    # 보낸 행은 저널 pending 에서 빠지는 그 순간 (같은 lock 안) 스냅샷으로 옮긴다.
+    # 그래야 refresh=False 로 읽어도 사라지지 않는다
+    def _on_flush(self, sheet, rows=None, removed=False):
+        if removed: self.syncs[sheet].drop_last()
+        elif rows is None: self.syncs[sheet].mark_stale()
+        else: self.syncs[sheet].push(rows)
+
+    # 저널이 delete op 를 보낼 때 (flush 안, 저널 lock 밖). 시트 끝이 지우려던 행일 때만 지운다
+    # (재시작 후 다시 보내도 다른 행을 지우지 않게)
+    def _remove_last(self, sheet, row):
+        sync = self.syncs[sheet]
+        sync.mark_stale()
+        sync.refresh()
+        if not sync.last_is(row): return False
+        sync.ws.delete_rows(sync.row_count())
+        return True
+
+    # 스냅샷 + 저널에 쌓인 op (add 는 붙이고 delete 는 마지막 행을 뺀다) -> (rows, records). 저널 lock 안에서
+    def _view(self, sheet):
+        sync = self.syncs[sheet]
+        rows, records = list(sync.rows), list(sync.records)
+        for op, row in self.journal.pending_ops(sheet):
+            if op == "add":
+                new_rows, new_records = sync.preview([row])
+                rows += new_rows
+                records += new_records
+            elif rows:
+                rows.pop()
+                records.pop()
+        return rows, records
+
+    def read_all(self, refresh=True):
+        # 시트 읽기는 저널 lock 밖에서 (다른 세션의 탭 / flush 가 기다리지 않게).
+        # 읽는 사이 그 시트로 보내기가 시작됐거나 스냅샷이 바뀌었으면 읽은 것은 버린다 (다음 rerun 에서 다시).
+        # 아직 못 받은 시트는 버릴 수 없으니 flush 와 겹치지 않게 sending 을 잡고 읽는다
+        loaded = set()
+        for sheet, sync in self.syncs.items():
+            if sync.loaded: continue
+            with self.journal.sending: sync.refresh()
+            loaded.add(sheet)
+        with self.journal.lock:
+            plans = {sheet: sync.plan() for sheet, sync in self.syncs.items()
+                     if sheet not in self.journal.inflight and sheet not in loaded and (sync.stale or refresh and sync.due())}
+        fetched = {sheet: self.syncs[sheet].fetch(plan) for sheet, plan in plans.items()}
+        with self.journal.lock:
+            for sheet, got in fetched.items():
+                if sheet not in self.journal.inflight: self.syncs[sheet].apply(plans[sheet], got)
+            return self._view("Logs")[1], self._view("Collection")[0]
+
+    def loaded(self):
+        return all(s.loaded and not s.stale for s in self.syncs.values())
+
+    def append_logs(self, rows):
+        self.journal.extend("Logs", rows)
+
+    def append_collection(self, rows):
+        self.journal.extend("Collection", rows)
+
+    # 네트워크를 타지 않는다. 아직 안 보낸 기록이면 저널에서만 취소하고,
+    # 아니면 지금 보이는 마지막 행을 지우는 op 를 저널에 쌓는다 (flush 가 앞선 op 뒤에 보낸다)
+    def delete_last_log(self):
+        with self.journal.lock:
+            if self.journal.cancel_last("Logs") is not None: return
+            rows, _ = self._view("Logs")
+            if rows: self.journal.delete("Logs", rows[-1])
+
+    def set_status(self, level):
+        self.journal.set_status(level)
+
+    def take_failures(self):
+        return self.journal.take_failed()
+
+    def backlog(self):
+        return len(self.journal.pending), self.journal.last_error
+
+    # 중간에 실패해도 다시 돌리면 된다.
+    #  1. 원본을 먼저 아카이브에 (유실 없음). 행마다 묶음 id 를 붙이고, 지난 시도에서 이미 옮긴 묶음이면 건너뛴다
+    #  2. 새 Logs 를 임시 시트에 다 쓴 뒤 삭제+이름 변경을 batch_update 한 번으로 바꿔치기
+    #  3. 2 가 실패하면 임시 시트를 지운다 (원래 Logs 는 그대로)
+    # 저널 lock 은 마지막에 시트를 바꿔 끼울 때만 잡는다 (그동안의 탭은 저널에 쌓였다가 새 Logs 로 나간다)
+    def compact_logs(self, cutoff_day):
+        with self.journal.sending:
+            self.journal.flush()    # 안 보낸 로그까지 시트에 넣고 시작
+            self.logs_sync.mark_stale()
+            self.logs_sync.refresh()
+            with self.journal.lock: logs = list(self.logs_sync.records)
+            new_rows, archived = compact(logs, cutoff_day)
+            if not archived: return 0
+            batch = batch_id(archived)
+            sh = self.ws_logs.spreadsheet
+            title = self.ws_logs.title
+            arc_title = title.replace("Logs", ARCHIVE_SHEET, 1)
+            tmp_title = f"{title}_compact_{batch}"
+            sheets = {ws.title: ws for ws in sh.worksheets()}
+            ws_arc = sheets.get(arc_title)
+            if ws_arc is None:
+                ws_arc = sh.add_worksheet(arc_title, len(archived) + 1, len(ARCHIVE_HEADER))
+                ws_arc.append_row(ARCHIVE_HEADER)
+            if batch not in ws_arc.col_values(len(ARCHIVE_HEADER)):
+                ws_arc.append_rows([row + [batch] for row in archived])
+            if tmp_title in sheets: sh.del_worksheet(sheets[tmp_title])    # 지난 시도가 남긴 것
+            tmp = sh.add_worksheet(tmp_title, len(new_rows) + 100, 5)
+            try:
+                tmp.append_rows([LOG_HEADER] + new_rows)
+                sh.batch_update({"requests": [
+                    {"deleteSheet": {"sheetId": self.ws_logs.id}},
+                    {"updateSheetProperties": {"properties": {"sheetId": tmp.id, "title": title, "index": self.ws_logs.index},
+                                               "fields": "title,index"}},
+                ]})
+            except Exception:
+                # 응답만 끊기고 바꿔치기는 됐을 수도 있다. 임시 시트가 그대로 있을 때만 지우고 실패로 본다
+                if tmp_title in {ws.title for ws in sh.worksheets()}:
+                    sh.del_worksheet(tmp)
+                    raise
+            ws_logs = sh.worksheet(title)
+            with self.journal.lock:
+                self.ws_logs = ws_logs
+                self.logs_sync.ws = self.ws_logs
+                self.logs_sync.invalidate()
+                self.journal.sheets["Logs"] = self.ws_logs
+            return len(archived)
+
+
+# 시작할 때 API 는 두 번 (동시에): 워크시트 목록 + Logs/Collection 값 (values_batch_get 한 번).
+# 시트마다 worksheet() 로 찾고 없으면 만드는 대신, 목록에 없는 것만 그때 만든다.
+# titles = {"Status": "Status_민수", "Logs": ..., "Collection": ...} -> ({같은 키: ws}, {"Logs": 값, "Collection": 값})
+SHEET_SHAPES = {"Status": (10, 5, None), "Logs": (1000, 5, LOG_HEADER), "Collection": (1000, 6, COL_HEADER)}
+SHEET_RANGES = {"Logs": "A:D", "Collection": "A:F"}
+
+
+def _batch_values(sh, titles):
+    keys = list(SHEET_RANGES)
+    res = sh.values_batch_get([f"'{titles[k]}'!{SHEET_RANGES[k]}" for k in keys])
+    return {k: vr.get("values", []) for k, vr in zip(keys, res.get("valueRanges", []))}
+
+
+def open_sheets(sh, titles):
+    with ThreadPoolExecutor(2) as ex:
+        f_values = ex.submit(_batch_values, sh, titles)
+        found = {ws.title: ws for ws in sh.worksheets()}
+        missing = [k for k in titles if titles[k] not in found]
+        try: values = f_values.result()
+        except Exception:
+            if not missing: raise
+            values = None       # 없는 시트 범위라서 실패 -> 만들고 다시 읽는다
+    sheets = {}
+    for key, title in titles.items():
+        ws = found.get(title)
+        if ws is None:
+            rows, cols, header = SHEET_SHAPES[key]
+            ws = sh.add_worksheet(title, rows, cols)
+            if header: ws.append_row(header)
+        sheets[key] = ws
+    if values is None: values = _batch_values(sh, titles)
+    return sheets, values
+
+
+# ==========================================
+# SQLite (로컬, 인덱스)
+# ==========================================
+# 읽기는 메모리 캐시 + "마지막 id 이후" 증분 조회라서 행 수와 무관하게 빠르다.
+# 트레이너별로 trainer 컬럼으로 나누고 (trainer, id) 인덱스로 자기 행만 읽는다.
+# mirror 에 SheetsStorage 를 주면 모든 쓰기를 시트에도 (저널을 거쳐) 복제한다.
+DEFAULT_TRAINER = "관희"
+
+TABLES = f"""
+CREATE TABLE IF NOT EXISTS logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    time TEXT NOT NULL, action TEXT NOT NULL, xp INTEGER NOT NULL DEFAULT 0, value,
+    trainer TEXT NOT NULL DEFAULT '{DEFAULT_TRAINER}'
+);
+CREATE TABLE IF NOT EXISTS collection (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    pid INTEGER NOT NULL, name TEXT, date TEXT, rarity TEXT, cost INTEGER NOT NULL DEFAULT 0, type TEXT,
+    trainer TEXT NOT NULL DEFAULT '{DEFAULT_TRAINER}'
+);
+CREATE TABLE IF NOT EXISTS status (key TEXT PRIMARY KEY, value);
+CREATE TABLE IF NOT EXISTS logs_archive (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    time TEXT NOT NULL, action TEXT NOT NULL, xp INTEGER NOT NULL DEFAULT 0, value,
+    trainer TEXT NOT NULL DEFAULT '{DEFAULT_TRAINER}'
+);
+CREATE INDEX IF NOT EXISTS idx_logs_trainer ON logs(trainer, id);
+CREATE INDEX IF NOT EXISTS idx_collection_trainer ON collection(trainer, id);
+CREATE INDEX IF NOT EXISTS idx_logs_archive_trainer ON logs_archive(trainer, id);
+"""
+
+
+class SQLiteStorage(Storage):
+    def __init__(self, path, trainer=DEFAULT_TRAINER, mirror=None):
+        self.trainer = trainer
+        self.mirror = mirror
+        self.mirror_error = None
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(TABLES)
+        self.logs, self.log_ids, self.cols = [], [], []
+        self.last_log_id = self.last_col_id = 0
+        if mirror is not None and self._is_empty(): self._seed(mirror)
+
+    def _is_empty(self):
+        return self.db.execute(
+            "SELECT NOT EXISTS (SELECT 1 FROM logs WHERE trainer = ?) AND NOT EXISTS (SELECT 1 FROM collection WHERE trainer = ?)",
+            (self.trainer, self.trainer)).fetchone()[0]
+
+    def _insert_logs(self, table, rows):
+        self.db.executemany(f"INSERT INTO {table} (time, action, xp, value, trainer) VALUES (?, ?, ?, ?, ?)",
+                            [(r[0], r[1], _int(r[2]), r[3], self.trainer) for r in rows])
+
+    def _insert_collection(self, rows):
+        self.db.executemany("INSERT INTO collection (pid, name, date, rarity, cost, type, trainer) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                            [(_int(r[0]), r[1], r[2], r[3], _int(r[4]), r[5], self.trainer) for r in rows])
+
+    # 처음 SQLite 로 옮길 때 시트 데이터를 그대로 가져온다
+    def _seed(self, mirror):
+        logs, cols = mirror.read_all()
+        with self.db:
+            self._insert_logs("logs", [[l.get("Time", ""), l.get("Action", ""), l.get("XP", 0), l.get("Value", "")] for l in logs])
+            self._insert_collection(cols)
+
+    def read_all(self, refresh=True):
+        # 로컬이라 refresh 와 상관없이 항상 최신
+        with self.lock:
+            for rid, t, a, xp, v in self.db.execute(
+                    "SELECT id, time, action, xp, value FROM logs WHERE trainer = ? AND id > ? ORDER BY id",
+                    (self.trainer, self.last_log_id)):
+                self.logs.append({"Time": t, "Action": a, "XP": xp, "Value": v})
+                self.log_ids.append(rid)
+                self.last_log_id = rid
+            for row in self.db.execute(
+                    "SELECT id, pid, name, date, rarity, cost, type FROM collection WHERE trainer = ? AND id > ? ORDER BY id",
+                    (self.trainer, self.last_col_id)):
+                self.cols.append(list(row[1:]))
+                self.last_col_id = row[0]
+            return list(self.logs), list(self.cols)
+
+    def append_logs(self, rows):
+        with self.lock, self.db:
+            self._insert_logs("logs", rows)
+        self._mirror("append_logs", rows)
+
+    def append_collection(self, rows):
+        with self.lock, self.db:
+            self._insert_collection(rows)
+        self._mirror("append_collection", rows)
+
+    def delete_last_log(self):
+        with self.lock:
+            row = self.db.execute("SELECT max(id) FROM logs WHERE trainer = ?", (self.trainer,)).fetchone()
+            if row[0] is None: return
+            with self.db:
+                self.db.execute("DELETE FROM logs WHERE id = ?", (row[0],))
+            if self.log_ids and self.log_ids[-1] == row[0]:
+                self.logs.pop(); self.log_ids.pop()
+        self._mirror("delete_last_log")
+
+    def set_status(self, level):
+        with self.lock, self.db:
+            self.db.execute("INSERT OR REPLACE INTO status (key, value) VALUES (?, ?)", (f"level:{self.trainer}", level))
+        self._mirror("set_status", level)
+
+    def compact_logs(self, cutoff_day):
+        with self.lock:
+            logs = [{"Time": t, "Action": a, "XP": xp, "Value": v} for t, a, xp, v in self.db.execute(
+                "SELECT time, action, xp, value FROM logs WHERE trainer = ? ORDER BY id", (self.trainer,))]
+            new_rows, archived = compact(logs, cutoff_day)
+            if not archived: return 0
+            with self.db:
+                self._insert_logs("logs_archive", archived)
+                self.db.execute("DELETE FROM logs WHERE trainer = ?", (self.trainer,))
+                self._insert_logs("logs", new_rows)
+            self.logs, self.log_ids, self.last_log_id = [], [], 0
+        self._mirror("compact_logs", cutoff_day)
+        return len(archived)
+
+    # SQLite 에는 이미 들어갔으므로 복제 쪽 상태만
+    def backlog(self):
+        if self.mirror is None: return 0, None
+        n, err = self.mirror.backlog()
+        return n, err or self.mirror_error
+
+    def _mirror(self, method, *args):
+        if self.mirror is None: return
+        # 미러 실패가 로컬 기록을 막으면 안 된다. 마지막 오류만 남겨 둔다
+        try:
+            getattr(self.mirror, method)(*args)
+            self.mirror_error = None
+        except Exception as e:
+            self.mirror_error = e
+
+
+def _int(v):
+    try: return int(float(v))
+    except (TypeError, ValueError): return 0
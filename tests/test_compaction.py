@@ -0,0 +1,82 @@
+import os
+import sys
+from datetime import date, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_sheets import make_spreadsheet
+from compaction import CLAIM_PREFIX, is_meta
+from storage import ARCHIVE_SHEET, SheetsStorage, open_sheets
+from game_state import GameState
+
+# ==========================================
+# 로그 압축: 집계가 그대로, 다시 돌려도 안전
+# ==========================================
+# 가짜 시트 (benchmarks/fake_sheets) 위에서 압축 전후의 GameState 를 비교한다.
+TITLES = {k: k for k in ("Status", "Logs", "Collection")}
+TODAY = date.today().isoformat()
+
+
+def open_storage(sh, path):
+    ws, values = open_sheets(sh, TITLES)
+    return SheetsStorage(ws["Status"], ws["Logs"], ws["Collection"], path, max_age=60, initial=values)
+
+
+# 로그 중간중간에 업적 달성 행을 끼워 둔 시트
+def claims_spreadsheet():
+    sh = make_spreadsheet(600, 3)
+    values = sh.sheets["Logs"].values
+    for i, name in ((50, "초보 모험가"), (300, "포켓몬 수집가"), (550, "마스터")):
+        values.insert(i, [values[i][0], CLAIM_PREFIX + name, "500", "0"])
+    return sh
+
+
+def summary(state):
+    months = {k: {kind: (xp, n, round(v, 2)) for kind, (xp, n, v) in kinds.items()}
+              for k, kinds in state.rollups.tables["month"].items()}
+    return (state.total_xp, +state.claims, dict(state.daily_xp), state.streak(TODAY), months)
+
+
+def days_ago(n):
+    return (date.today() - timedelta(days=n)).isoformat()
+
+
+def test_compaction_keeps_totals(tmp_path):
+    sh = claims_spreadsheet()
+    storage = open_storage(sh, str(tmp_path / "journal.jsonl"))
+    before = summary(GameState().sync(*storage.read_all()))
+    n_logs = len(sh.sheets["Logs"].values) - 1
+
+    moved = storage.compact_logs(days_ago(60))
+    assert moved > 0
+    assert summary(GameState().sync(*storage.read_all())) == before
+    # 이미 압축한 부분에 더 늦은 cutoff 로 한 번 더
+    moved += storage.compact_logs(days_ago(10))
+    assert summary(GameState().sync(*storage.read_all())) == before
+
+    assert len(sh.sheets[ARCHIVE_SHEET].values) - 1 == moved
+    assert len([r for r in sh.sheets["Logs"].values[1:] if not is_meta(r[1])]) == n_logs - moved
+    assert not [t for t in sh.sheets if "_compact_" in t]
+
+
+def test_compaction_retry_after_failed_swap(tmp_path, monkeypatch):
+    sh = claims_spreadsheet()
+    storage = open_storage(sh, str(tmp_path / "journal.jsonl"))
+    before = summary(GameState().sync(*storage.read_all()))
+    logs_before = [list(r) for r in sh.sheets["Logs"].values]
+
+    batch_update = sh.batch_update
+    monkeypatch.setattr(sh, "batch_update", lambda body: (_ for _ in ()).throw(ConnectionError("connection reset")))
+    with pytest.raises(ConnectionError): storage.compact_logs(days_ago(60))
+    # 원래 Logs 는 그대로, 임시 시트는 지웠다 (아카이브에는 이미 들어갔다)
+    assert sh.sheets["Logs"].values == logs_before
+    assert not [t for t in sh.sheets if "_compact_" in t]
+    archived = len(sh.sheets[ARCHIVE_SHEET].values) - 1
+
+    monkeypatch.setattr(sh, "batch_update", batch_update)
+    assert storage.compact_logs(days_ago(60)) == archived
+    # 같은 묶음을 두 번 아카이브하지 않는다
+    assert len(sh.sheets[ARCHIVE_SHEET].values) - 1 == archived
+    assert summary(GameState().sync(*storage.read_all())) == before
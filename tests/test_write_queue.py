@@ -0,0 +1,145 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_sheets import make_spreadsheet
+from storage import SheetsStorage, open_sheets
+from write_queue import WriteJournal
+from game_state import GameState
+
+# ==========================================
+# 쓰기 저널 + 증분 동기화: 유실/중복 없음
+# ==========================================
+# 가짜 시트 (benchmarks/fake_sheets) 위에서 재시작 복구와 액션 직후 읽기를 확인한다.
+# 저널 백그라운드 flush 가 끼어들어도 결과가 같아야 하므로 마지막 상태만 본다.
+TITLES = {k: k for k in ("Status", "Logs", "Collection")}
+NEW_ROWS = [["2099-01-01 08:00:00", "💧 물 마시기", 10, 0], ["2099-01-01 09:00:00", "🏃 달리기 5.0km", 250, 5.0]]
+
+
+def open_storage(sh, path):
+    ws, values = open_sheets(sh, TITLES)
+    return SheetsStorage(ws["Status"], ws["Logs"], ws["Collection"], path, max_age=60, initial=values)
+
+
+def sheet_actions(sh):
+    return [row[1] for row in sh.sheets["Logs"].values[1:]]
+
+
+# 첫 실행이 send 까지 기록하고 append_rows 가 (landed=True 면 시트에 넣은 뒤) 끊긴 상황을 만든다
+def crash_mid_flush(sh, path, monkeypatch, landed):
+    ws = sh.sheets["Logs"]
+    append_rows = ws.append_rows
+
+    def broken(rows, **kwargs):
+        if landed: append_rows(rows, **kwargs)
+        raise ConnectionError("connection reset")
+    monkeypatch.setattr(ws, "append_rows", broken)
+    journal = WriteJournal(path, {"Status": sh.sheets["Status"], "Logs": ws, "Collection": sh.sheets["Collection"]}, delay=3600)
+    journal.extend("Logs", NEW_ROWS)
+    with pytest.raises(ConnectionError): journal.flush()
+    assert journal.unsure
+    monkeypatch.setattr(ws, "append_rows", append_rows)
+
+
+@pytest.mark.parametrize("landed", [True, False])
+def test_restart_after_interrupted_flush(tmp_path, monkeypatch, landed):
+    sh = make_spreadsheet(20, 3)
+    before = sheet_actions(sh)
+    path = str(tmp_path / "journal.jsonl")
+    crash_mid_flush(sh, path, monkeypatch, landed)
+
+    storage = open_storage(sh, path)
+    storage.journal.flush()
+
+    assert sheet_actions(sh) == before + [r[1] for r in NEW_ROWS]
+    assert not storage.journal.pending and not storage.journal.unsure
+    logs, _ = storage.read_all()
+    assert [l["Action"] for l in logs] == sheet_actions(sh)
+    # 한 번 더 재시작해도 다시 보내지 않는다
+    assert not open_storage(sh, path).journal.pending
+
+
+def test_tap_flush_tap_keeps_every_row(tmp_path):
+    sh = make_spreadsheet(20, 3)
+    storage = open_storage(sh, str(tmp_path / "journal.jsonl"))
+    state = GameState().sync(*storage.read_all())
+    base = state.total_xp
+
+    # 액션 직후 rerun 은 refresh=False. 앞서 보낸 행이 스냅샷에서 빠지면 안 된다
+    for i, row in enumerate(NEW_ROWS * 2):
+        storage.append_log(row)
+        state.sync(*storage.read_all(refresh=False))
+        storage.journal.flush()
+        state.sync(*storage.read_all(refresh=False))
+        assert state.total_xp == base + sum(r[2] for r in (NEW_ROWS * 2)[:i + 1])
+
+    assert len(sh.sheets["Logs"].values) == 1 + 20 + 4
+    logs, _ = storage.read_all()
+    assert GameState().sync(logs, []).total_xp == state.total_xp
+
+
+def test_undo_before_and_after_flush(tmp_path):
+    sh = make_spreadsheet(20, 3)
+    storage = open_storage(sh, str(tmp_path / "journal.jsonl"))
+    before = sheet_actions(sh)
+
+    # 아직 안 보낸 기록은 저널에서만 취소
+    storage.append_log(NEW_ROWS[0])
+    storage.delete_last_log()
+    storage.journal.flush()
+    assert sheet_actions(sh) == before
+
+    # 이미 시트에 들어간 기록은 시트 마지막 행을 지운다
+    storage.append_log(NEW_ROWS[1])
+    storage.journal.flush()
+    assert sheet_actions(sh) == before + [NEW_ROWS[1][1]]
+    storage.delete_last_log()
+    logs, _ = storage.read_all(refresh=False)
+    assert [l["Action"] for l in logs] == before
+    storage.journal.flush()
+    assert sheet_actions(sh) == before
+    logs, _ = storage.read_all(refresh=False)
+    assert [l["Action"] for l in logs] == before
+
+
+# 보냈는데 응답을 못 받은 (unsure) 행을 undo: 저널에서 취소하면 시트에 남은 행과 앱이 어긋난다
+@pytest.mark.parametrize("landed", [True, False])
+def test_undo_unsure_row(tmp_path, monkeypatch, landed):
+    sh = make_spreadsheet(20, 3)
+    before = sheet_actions(sh)
+    path = str(tmp_path / "journal.jsonl")
+    crash_mid_flush(sh, path, monkeypatch, landed)
+    storage = open_storage(sh, path)
+
+    storage.delete_last_log()
+    storage.append_log(NEW_ROWS[0])
+    storage.journal.flush()
+
+    expected = before + [NEW_ROWS[0][1], NEW_ROWS[0][1]]
+    assert sheet_actions(sh) == expected
+    logs, _ = storage.read_all()
+    assert [l["Action"] for l in logs] == expected
+    assert not storage.journal.pending and not storage.journal.unsure
+
+
+# 시트에 들어간 기록의 undo 는 저널에 delete 로 남는다. 보내기 전에 재시작해도 지워지고, 두 번 지우지 않는다
+def test_queued_undo_survives_restart(tmp_path):
+    sh = make_spreadsheet(20, 3)
+    path = str(tmp_path / "journal.jsonl")
+    before = sheet_actions(sh)
+    storage = open_storage(sh, path)
+    storage.append_logs(NEW_ROWS)
+    storage.journal.flush()
+    storage.delete_last_log()
+    storage.delete_last_log()
+    assert sheet_actions(sh) == before + [r[1] for r in NEW_ROWS]
+
+    for _ in range(2):
+        storage = open_storage(sh, path)
+        storage.journal.flush()
+        assert sheet_actions(sh) == before
+        logs, _ = storage.read_all(refresh=False)
+        assert [l["Action"] for l in logs] == before
@@ -0,0 +1,37 @@
+from pokedex import KOR_NAMES
+
+# ==========================================
+# 화면 조각 (HTML)
+# ==========================================
+# streamlit 없이도 만들 수 있게 떼어 둔 것 (벤치마크에서 그대로 호출한다)
+
+
+def dex_cells(poke_ids, counts, shinies, sprites):
+    kinds = [("shiny" if pid in shinies else "normal") if pid in counts else "shadow" for pid in poke_ids]
+    img_urls = sprites.uris(list(zip(kinds, poke_ids)))
+    cells = []
+    for pid, img_url in zip(poke_ids, img_urls):
+        if pid in counts:
+            box_class = "shiny-box" if pid in shinies else "poke-box"
+            k_name = KOR_NAMES.get(pid, f"No.{pid}")
+            if pid in shinies: k_name = f"🌟 {k_name}"
+            cells.append(f"""<div class="{box_class}"><img src="{img_url}" class="color-img"><div style="font-size:11px; font-weight:bold;">{k_name}</div></div>""")
+        else:
+            cells.append(f"""<div class="poke-box" style="opacity:0.5;"><img src="{img_url}" class="shadow-img"><div style="font-size:11px; color:#ccc;">{pid}</div></div>""")
+    return cells
+
+
+# 컬렉션 업적 카드 하나 (제목/설명/실루엣/진행 막대/상태를 HTML 한 덩어리로)
+def set_card(p_set, collected, shadow_urls, claimed):
+    n, total = len(collected), len(p_set['ids'])
+    imgs = "".join(f"<img src='{shadow_urls[pid]}' class='shadow-img' style='width:35px;'>" for pid in p_set['ids'])
+    if claimed: badge = "<span style='color:#27AE60;'>✅ 완료</span>"
+    elif n == total: badge = "<span style='color:#D4AC0D;'>🎁 보상 받기 가능</span>"
+    else: badge = "<span style='color:#999;'>🔒 미달성</span>"
+    return (f"<div class='set-card'>"
+            f"<div style='font-weight:bold; font-size:16px;'>{p_set['name']} <span style='color:#D4AC0D; font-size:13px;'>({p_set['reward']}G)</span></div>"
+            f"<div style='font-size:12px; color:#666; margin-bottom:8px;'>{p_set['desc']}</div>"
+            f"<div style='text-align:center; margin-bottom:8px;'>{imgs}</div>"
+            f"<div class='set-bar'><div style='width:{n / total * 100:.0f}%;'></div></div>"
+            f"<div style='display:flex; justify-content:space-between; font-size:12px;'>{badge}<span>{n} / {total}</span></div>"
+            f"</div>")
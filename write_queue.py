@@ -0,0 +1,254 @@
+import itertools
+import json
+import os
+import threading
+import time
+import uuid
+from sheet_sync import numericise
+
+# ==========================================
+# 쓰기 저널 (write-behind)
+# ==========================================
+# 액션은 로컬 저널 파일에 즉시 기록되고, 백그라운드 스레드가 모아서
+# append_rows / batch_update 로 한 번에 시트에 보낸다.
+#
+# 저널 파일은 한 줄에 하나씩 다음 op를 쌓는다.
+#   {"op": "add", "id", "sheet", "row"}   새 행 (Logs / Collection)
+#   {"op": "delete", "id", "sheet", "row"} 시트 마지막 행이 row 면 지운다 (이미 보낸 행의 undo)
+#   {"op": "status", "value"}             Status!A2 (마지막 값만 의미 있음)
+#   {"op": "send", "ids"}                 API 호출 직전
+#   {"op": "done", "ids"}                 API 호출 성공
+#   {"op": "cancel", "id"}                아직 안 보낸 행을 취소 (undo)
+#   {"op": "fail", "ids"}                 다시 보내도 안 되는 오류 (4xx) -> 버린다
+# 재시작 시 send 는 있는데 done 이 없는 묶음은 시트 끝부분과 비교해서
+# 이미 들어갔으면 done 처리, 아니면 다시 보낸다 -> 유실/중복 없음.
+#
+# add / delete 는 시트마다 쌓인 순서대로 보낸다 (이어진 add 는 append_rows 한 번).
+# API 호출 중에는 lock 을 놓는다 (앱의 기록 추가/취소가 전송을 기다리지 않게).
+# 그동안 그 시트는 inflight 에 들어 있고, 읽는 쪽은 그 시트를 새로 받지 않는다.
+# 버린 행은 failed 에 남겨 앱이 화면에서 되돌렸다고 알려 준다.
+
+
+def _same_row(a, b):
+    a = [numericise(str(v)) for v in a]
+    b = [numericise(str(v)) for v in b]
+    n = max(len(a), len(b))
+    return a + [""] * (n - len(a)) == b + [""] * (n - len(b))
+
+
+# 4xx (권한/범위/형식 오류) 는 몇 번을 보내도 같다. 429, 408, 5xx, 네트워크 오류는 재시도
+def _retryable(e):
+    code = getattr(getattr(e, "response", None), "status_code", None)
+    return code is None or code in (408, 429) or code >= 500
+
+
+class WriteJournal:
+    def __init__(self, path, sheets, delay=1.0, retry=5.0, on_flush=None, remove_last=None):
+        self.path = path
+        self.sheets = sheets        # {"Logs": ws, "Collection": ws, "Status": ws}
+        # on_flush(sheet, rows=None, removed=False): 그 시트 끝에 rows 를 붙였거나 (removed) 마지막 행을 지운 직후 (lock 안).
+        # 둘 다 아니면 무엇이 바뀌었는지 모름
+        self.on_flush = on_flush
+        self.remove_last = remove_last  # remove_last(sheet, row) -> 지웠는지. delete op 를 보낼 때 (lock 밖)
+        self.delay = delay          # 첫 쓰기 후 이만큼 더 모았다가 보낸다
+        self.retry = retry
+        self.pending = []           # [{"op", "id", "sheet", "row"}] 보낼 순서대로
+        self.unsure = set()         # send 후 done 이 없던 id (재시작 복구용)
+        self.status = None
+        self.last_error = None
+        self.failed = []            # [{"sheet", "row", "error"}] 버린 쓰기 (take_failed 로 가져간다)
+        self.inflight = set()       # 지금 API 로 보내는 중인 시트
+        self.lock = threading.RLock()
+        self.sending = threading.RLock()    # flush 한 번 전체. 시트 행 번호를 건드리는 작업은 이걸 잡는다
+        self.wake = threading.Event()
+        self._replay()
+        self._file = open(self.path, "a", encoding="utf-8")
+        if self.pending or self.status is not None: self.wake.set()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    # ---------- 저널 파일 ----------
+    def _replay(self):
+        if not os.path.exists(self.path): return
+        entries, sent = {}, set()
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try: op = json.loads(line)
+                except ValueError: continue   # 쓰다 끊긴 마지막 줄
+                kind = op.get("op")
+                if kind in ("add", "delete"): entries[op["id"]] = op
+                elif kind == "status": self.status = op["value"]
+                elif kind == "send": sent.update(op["ids"])
+                elif kind in ("done", "fail"):
+                    for i in op["ids"]:
+                        if i in entries: del entries[i]
+                        sent.discard(i)
+                    if "status" in op: self.status = None
+                elif kind == "cancel": entries.pop(op["id"], None)
+        self.pending = list(entries.values())
+        self.unsure = {i for i in sent if i in entries}
+        self._rewrite()
+
+    def _rewrite(self):
+        # 살아 있는 op만 남겨 저널을 다시 쓴다 (원자적 교체)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for e in self.pending:
+                f.write(json.dumps(e, ensure_ascii=False) + "\n")
+            if self.unsure:
+                f.write(json.dumps({"op": "send", "ids": sorted(self.unsure)}) + "\n")
+            if self.status is not None:
+                f.write(json.dumps({"op": "status", "value": self.status}) + "\n")
+            f.flush(); os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    # 여러 op 를 한 번에 쓰고 fsync 는 한 번만
+    def _log(self, *ops):
+        self._file.write("".join(json.dumps(op, ensure_ascii=False) + "\n" for op in ops))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    # ---------- 앱에서 호출 ----------
+    def extend(self, sheet, rows):
+        entries = [{"op": "add", "id": uuid.uuid4().hex, "sheet": sheet, "row": list(row)} for row in rows]
+        if not entries: return
+        with self.lock:
+            self._log(*entries)
+            self.pending += entries
+        self.wake.set()
+
+    # 이미 보냈을 (또는 보내는 중일) 행의 undo. 앞선 op 가 다 나간 뒤 시트 끝이 row 일 때 지운다
+    def delete(self, sheet, row):
+        entry = {"op": "delete", "id": uuid.uuid4().hex, "sheet": sheet, "row": list(row)}
+        with self.lock:
+            self._log(entry)
+            self.pending.append(entry)
+        self.wake.set()
+
+    def set_status(self, value):
+        with self.lock:
+            self._log({"op": "status", "value": value})
+            self.status = value
+        self.wake.set()
+
+    # [(op, row)] 보낼 순서대로
+    def pending_ops(self, sheet):
+        with self.lock:
+            return [(e["op"], e["row"]) for e in self.pending if e["sheet"] == sheet]
+
+    def take_failed(self):
+        with self.lock:
+            failed, self.failed = self.failed, []
+        return failed
+
+    # 아직 시트로 안 나간 마지막 행을 취소. 없거나, 마지막 op 가 delete 이거나, 보냈는지 확실하지 않은
+    # (unsure, 보내는 중 포함) 행이면 None -> 부르는 쪽이 delete 를 쌓는다
+    def cancel_last(self, sheet):
+        with self.lock:
+            for e in reversed(self.pending):
+                if e["sheet"] != sheet: continue
+                if e["op"] != "add" or e["id"] in self.unsure: return None
+                self._log({"op": "cancel", "id": e["id"]})
+                self.pending.remove(e)
+                self.unsure.discard(e["id"])
+                return e["row"]
+        return None
+
+    # ---------- 백그라운드 flush ----------
+    def _run(self):
+        while True:
+            self.wake.wait()
+            time.sleep(self.delay)
+            self.wake.clear()
+            try:
+                self.flush()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = e
+                time.sleep(self.retry)
+                self.wake.set()
+
+    def flush(self):
+        # 보내는 동안 그 시트는 inflight 라서 읽는 쪽이 시트를 다시 받지 않는다.
+        # 시트에 들어간 행이 저널 쪽에도 남아 두 번 세어지는 순간은 없다.
+        with self.sending:
+            for sheet in ("Logs", "Collection"):
+                while self._send_next(sheet): pass
+
+            with self.lock: value = self.status
+            if value is not None:
+                try:
+                    self.sheets["Status"].batch_update([{"range": "A2", "values": [[value]]}])
+                except Exception as e:
+                    if _retryable(e): raise
+                    with self.lock: self.failed.append({"sheet": "Status", "row": [value], "error": e})
+                with self.lock:
+                    # 보내는 사이 새 값이 들어왔으면 그건 다음 flush 에서
+                    if self.status == value:
+                        self._log({"op": "done", "ids": [], "status": True})
+                        self.status = None
+
+            with self.lock:
+                if not self.pending and not self.unsure and self.status is None:
+                    self._file.close()
+                    self._rewrite()
+                    self._file = open(self.path, "a", encoding="utf-8")
+
+    # 그 시트의 맨 앞 묶음 (이어진 add 들, 또는 delete 하나) 을 보낸다. 보낼 것이 없으면 False
+    def _send_next(self, sheet):
+        with self.lock: batch = self._next_batch(sheet)
+        if not batch: return False
+        # unsure 행은 flush 만 건드린다 (cancel_last 는 넘어간다) -> 시트 확인은 lock 밖에서
+        sent = [e for e in batch if e["id"] in self.unsure]
+        if batch[0]["op"] == "add" and sent and self._already_written(self.sheets[sheet], sent):
+            with self.lock:
+                self._done(sent)
+                if self.on_flush: self.on_flush(sheet)
+            return True
+        with self.lock:
+            batch = self._next_batch(sheet)     # 그 사이 취소된 행은 빼고
+            if not batch: return False
+            ws = self.sheets[sheet]
+            ids = [e["id"] for e in batch]
+            self._log({"op": "send", "ids": ids})
+            self.unsure.update(ids)
+            self.inflight.add(sheet)
+        try:
+            if batch[0]["op"] == "delete": removed = self.remove_last(sheet, batch[0]["row"])
+            else: ws.append_rows([e["row"] for e in batch])
+        except Exception as e:
+            with self.lock:
+                self.inflight.discard(sheet)
+                if _retryable(e): raise
+                self._fail(sheet, batch, e)
+            return True
+        with self.lock:
+            self.inflight.discard(sheet)
+            self._done(batch)
+            if self.on_flush and batch[0]["op"] == "add": self.on_flush(sheet, [e["row"] for e in batch])
+            elif self.on_flush: self.on_flush(sheet, removed=removed)
+        return True
+
+    def _next_batch(self, sheet):
+        ops = [e for e in self.pending if e["sheet"] == sheet]
+        if not ops or ops[0]["op"] == "delete": return ops[:1]
+        return list(itertools.takewhile(lambda e: e["op"] == "add", ops))
+
+    def _done(self, entries):
+        ids = [e["id"] for e in entries]
+        self._log({"op": "done", "ids": ids})
+        self.unsure.difference_update(ids)
+        done = set(ids)
+        self.pending = [e for e in self.pending if e["id"] not in done]
+
+    def _fail(self, sheet, entries, error):
+        ids = [e["id"] for e in entries]
+        self._log({"op": "fail", "ids": ids})
+        self.unsure.difference_update(ids)
+        gone = set(ids)
+        self.pending = [e for e in self.pending if e["id"] not in gone]
+        self.failed += [{"sheet": sheet, "row": e["row"], "error": error} for e in entries]
+
+    def _already_written(self, ws, sent):
+        # 재시작 전에 보냈던 묶음이 시트 끝에 그대로 있는지 확인
+        tail = ws.get_all_values()[-len(sent):]
+        return len(tail) == len(sent) and all(_same_row(t, e["row"]) for t, e in zip(tail, sent))